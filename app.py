@@ -2,16 +2,150 @@
 SmartAgri LSTM Prediction Server
 
 Run from project root:
-    python app.py
+    python app.py                              # development: one process, auto-reload
 
 Starts the FastAPI server on http://localhost:8000
+
+Production (no reload):
+    python app.py --workers 4                  # 4 uvicorn worker processes, each loads models on demand
+    python app.py --workers 4 --preload        # load every model once, then fork the workers (POSIX only)
+
+With --preload the parent loads data/models into the registry and freezes the GC, then forks; the workers
+share the model pages copy-on-write and accept on one listening socket. SIGTERM / Ctrl+C stops the workers
+gracefully (in-flight requests finish, up to --graceful-timeout seconds); a worker that dies is replaced.
+Each worker gets --torch-threads intra-op threads (default: cores / workers).
 """
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
 import uvicorn
 
+APP = "backend.lstm_prediction.main:app"
+
+
+def log(msg):
+    print(f"[app.py {os.getpid()}] {msg}", flush=True)
+
+
+def _run_worker(sock: socket.socket, args) -> None:
+    """Forked child: serve the preloaded app on the shared socket until SIGTERM."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    from backend.lstm_prediction import compute, main as api
+
+    compute.set_torch_threads(args.torch_threads)
+    config = uvicorn.Config(api.app, log_level=args.log_level, timeout_graceful_shutdown=args.graceful_timeout)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve_preforked(args) -> None:
+    """Preload models, then fork args.workers workers on one socket and supervise them."""
+    import gc
+
+    from backend.lstm_prediction import compute, main as api
+
+    compute.set_torch_threads(args.torch_threads)
+    t0 = time.perf_counter()
+    loaded = api.preload_models()
+    log(f"Preloaded {loaded} models in {time.perf_counter() - t0:.1f}s")
+    # Move everything allocated so far out of the GC's view: collections in the workers then never touch
+    # (and copy) the pages holding the preloaded models
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = {}
+    stopping = {"at": None}
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(sock, args)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        if stopping["at"] is None:
+            log(f"Shutting down {len(children)} workers ...")
+            stopping["at"] = time.monotonic()
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(args.workers):
+        spawn()
+    log(f"Serving on http://{args.host}:{args.port} with {args.workers} workers (pids {sorted(children)})")
+
+    while children:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            if stopping["at"] is not None and time.monotonic() - stopping["at"] > args.graceful_timeout + 5:
+                for pid in children:
+                    os.kill(pid, signal.SIGKILL)
+            time.sleep(0.2)
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping["at"] is not None:
+            continue
+        log(f"Worker {pid} exited (status {status}); starting a new one")
+        if time.monotonic() - started < 1:
+            time.sleep(1)  # do not spin if workers die on startup
+        spawn()
+    sock.close()
+    log("Stopped.")
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Run the LSTM prediction API.")
+    parser.add_argument("--host", default=os.environ.get("LSTM_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("LSTM_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("LSTM_WORKERS", "0")),
+                        help="Worker processes; any value (even 1) runs without auto-reload (default: development mode)")
+    parser.add_argument("--preload", action="store_true",
+                        help="Load all models in the parent and fork the workers after (shares model memory; POSIX only)")
+    parser.add_argument("--torch-threads", type=int, default=0, help="Torch intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if args.workers <= 0 and not args.preload:
+        uvicorn.run(APP, host=args.host, port=args.port, reload=True, log_level=args.log_level)
+        return
+
+    args.workers = max(1, args.workers)
+    args.torch_threads = args.torch_threads or max(1, cores // args.workers)
+    # Read by backend/lstm_prediction at import, in this process and in every worker
+    os.environ["LSTM_TORCH_THREADS"] = str(args.torch_threads)
+    os.environ.setdefault("LSTM_COMPUTE_WORKERS", str(max(1, cores // (2 * args.workers))))
+
+    if args.preload and hasattr(os, "fork"):
+        serve_preforked(args)
+        return
+    if args.preload:
+        log("--preload needs os.fork (not available on Windows); starting uvicorn workers instead")
+    uvicorn.run(APP, host=args.host, port=args.port, workers=args.workers, log_level=args.log_level,
+                timeout_graceful_shutdown=args.graceful_timeout)
+
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "backend.lstm_prediction.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-    )
+    main()
+    sys.exit(0)
@@ -56,23 +56,45 @@ app.post('/api/auth/register', (req, res) => {
 });
 
 // Forward to LSTM Prediction service
+// Upstream caching headers the browser needs to revalidate graph data
+const CACHE_HEADERS = ['etag', 'cache-control'];
+
 async function forwardToLstm(req, res) {
   const url = `${LSTM_PREDICTION_URL}${req.originalUrl}`;
   try {
+    const headers = { 'Content-Type': 'application/json' };
+    // Pass the browser's validator through so the LSTM service can answer 304 Not Modified
+    if (req.headers['if-none-match']) headers['If-None-Match'] = req.headers['if-none-match'];
     const config = {
       method: req.method,
       url,
-      headers: { 'Content-Type': 'application/json' },
-      timeout: 30000
+      headers,
+      timeout: 30000,
+      // Raw upstream bytes: the strong ETag belongs to exactly this body, so it must not be re-serialized
+      responseType: 'arraybuffer',
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304
     };
     if (req.method === 'POST' && req.body && Object.keys(req.body).length) {
       config.data = req.body;
     }
     const resp = await axios(config);
-    res.status(resp.status).json(resp.data);
+    for (const name of CACHE_HEADERS) {
+      if (resp.headers[name]) res.set(name, resp.headers[name]);
+    }
+    if (resp.status === 304) return res.status(304).end();
+    res.set('Content-Type', resp.headers['content-type'] || 'application/json');
+    res.status(resp.status).send(Buffer.from(resp.data));
   } catch (err) {
     const status = err.response?.status || 502;
-    const msg = err.response?.data?.detail || err.response?.data?.message || err.message;
+    const retryAfter = err.response?.headers?.['retry-after'];
+    if (retryAfter) res.set('Retry-After', retryAfter);  // 503 from a full inference queue
+    let body = {};
+    try {
+      body = JSON.parse(Buffer.from(err.response?.data || '').toString('utf8'));
+    } catch (_) {
+      // not a JSON error body
+    }
+    const msg = body?.detail || body?.message || err.message;
     res.status(status).json({ success: false, message: msg || `Error connecting to LSTM Prediction (${LSTM_PREDICTION_URL})` });
   }
 }
@@ -80,6 +102,7 @@ async function forwardToLstm(req, res) {
 app.use('/api/crops', (req, res) => forwardToLstm(req, res));
 app.use('/api/graphs', (req, res) => forwardToLstm(req, res));
 app.use('/api/user-predictions', (req, res) => forwardToLstm(req, res));
+app.use('/api/predictions/batch', (req, res) => forwardToLstm(req, res));
 
 // Health
 app.get('/health', (req, res) => res.json({ status: 'ok', backend: true, lstmPrediction: LSTM_PREDICTION_URL }));
@@ -90,6 +113,6 @@ app.use((req, res) => res.status(404).json({ error: 'Route not found' }));
 
 app.listen(PORT, () => {
   console.log(`Backend running on http://localhost:${PORT}`);
-  console.log(`Forwarding /api/crops, /api/graphs, /api/user-predictions → LSTM Prediction (${LSTM_PREDICTION_URL})`);
+  console.log(`Forwarding /api/crops, /api/graphs, /api/user-predictions, /api/predictions/batch → LSTM Prediction (${LSTM_PREDICTION_URL})`);
   console.log('Start LSTM Prediction first: uvicorn backend.lstm_prediction.main:app --reload --port 8000');
 });
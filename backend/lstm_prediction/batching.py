@@ -0,0 +1,101 @@
+"""
+Cross-request micro-batching for LSTM inference.
+Concurrent forecasts that use the same loaded model are collected for up to LSTM_BATCH_MAX_WAIT_MS
+(or until LSTM_BATCH_MAX_SIZE requests are waiting) and run as one (batch, lookback, 1) rollout.
+Each caller gets back its own row, cut to the number of days it asked for. Commodities served by the
+shared global model all land in one group; their rows carry per-row commodity ids.
+"""
+import asyncio
+import os
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+MAX_WAIT_MS = float(os.environ.get("LSTM_BATCH_MAX_WAIT_MS", "5"))
+MAX_BATCH_SIZE = int(os.environ.get("LSTM_BATCH_MAX_SIZE", "32"))
+
+
+class _Pending:
+    __slots__ = ("entry", "items", "timer")
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.items: List[tuple] = []  # (entry, scaled window, days_ahead, future)
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class InferenceBatcher:
+    """Groups submit() calls by loaded model and runs `run_batch(entry, windows, days_ahead, ids)` once per group.
+
+    run_batch gets windows as a (batch, lookback) float32 array and must return (batch, days_ahead).
+    ids is the per-row entry.commodity_id list for the global model, None for per-commodity models.
+    It runs in `executor` (None = the event loop's default thread pool) so the loop is never blocked.
+    """
+
+    def __init__(self, run_batch: Callable, max_wait_ms: float = MAX_WAIT_MS,
+                 max_batch_size: int = MAX_BATCH_SIZE, executor=None):
+        self.run_batch = run_batch
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.executor = executor
+        self._pending: Dict[int, _Pending] = {}
+        self._lock = threading.Lock()
+        self.batch_sizes: Counter = Counter()
+        self.requests = 0
+
+    async def submit(self, entry, scaled_window: np.ndarray, days_ahead: int) -> np.ndarray:
+        """Queue one forecast and wait for its (days_ahead,) result from a shared batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = id(entry.model)  # same weights (the global model is shared by all its commodities)
+        group = self._pending.get(key)
+        if group is None:
+            group = self._pending[key] = _Pending(entry)
+        group.items.append((entry, scaled_window, days_ahead, future))
+        if len(group.items) >= self.max_batch_size:
+            self._flush(key)
+        elif group.timer is None:
+            group.timer = loop.call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key: int) -> None:
+        group = self._pending.pop(key, None)
+        if group is None:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+        with self._lock:
+            self.batch_sizes[len(group.items)] += 1
+            self.requests += len(group.items)
+        asyncio.ensure_future(self._run(group))
+
+    async def _run(self, group: _Pending) -> None:
+        items = group.items
+        windows = np.stack([w for _, w, _, _ in items]).astype(np.float32, copy=False)
+        days = max(d for _, _, d, _ in items)
+        ids = None if group.entry.commodity_id is None else [e.commodity_id for e, _, _, _ in items]
+        loop = asyncio.get_running_loop()
+        try:
+            outs = await loop.run_in_executor(self.executor, self.run_batch, group.entry, windows, days, ids)
+        except Exception as e:
+            for _, _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for row, (_, _, d, future) in zip(outs, items):
+            if not future.done():
+                future.set_result(row[:d])
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = sum(self.batch_sizes.values())
+            return {
+                "maxWaitMs": self.max_wait * 1000,
+                "maxBatchSize": self.max_batch_size,
+                "requests": self.requests,
+                "batches": batches,
+                "avgBatchSize": round(self.requests / batches, 2) if batches else 0.0,
+                "batchSizeHistogram": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            }
@@ -0,0 +1,159 @@
+"""
+Result cache for the prediction API.
+Entries live in memory (LRU, LSTM_FORECAST_CACHE_SIZE entries, each valid for LSTM_FORECAST_CACHE_TTL seconds).
+Keys carry the data version and model digest, so a new ingest or retrained model simply stops matching old
+entries; they age out instead of being deleted. With LSTM_FORECAST_CACHE_DB=<path> entries are also written
+to a small SQLite file, so a restarted worker starts warm. Memory and disk have separate locks: a slow disk
+read or commit never holds up a memory lookup, and async callers run get_disk()/put_disk() on an executor.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+CACHE_SIZE = int(os.environ.get("LSTM_FORECAST_CACHE_SIZE", "4096"))
+CACHE_TTL = float(os.environ.get("LSTM_FORECAST_CACHE_TTL", str(6 * 3600)))  # seconds
+CACHE_DB = os.environ.get("LSTM_FORECAST_CACHE_DB", "")  # optional on-disk backing, e.g. data/forecast_cache.db
+PRUNE_EVERY = 256  # puts between deletes of expired rows in the disk backing
+
+
+class ResultCache:
+    """Thread-safe TTL + LRU cache of JSON-serializable values keyed by tuples."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL, disk_path: Optional[str] = CACHE_DB or None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()  # memory entries and counters
+        self._disk_lock = threading.Lock()  # the disk backing's connection
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_pid = 0
+        self._puts = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.disk_path = disk_path
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._disk_conn().execute("DELETE FROM result_cache WHERE expires_at < ?", (time.time(),))
+            self._disk.commit()
+
+    def _disk_conn(self) -> Optional[sqlite3.Connection]:
+        """The disk backing's connection for this process (reopened after a fork), or None. Call under
+        self._disk_lock (or from __init__)."""
+        if not self.disk_path:
+            return None
+        if self._disk is None or self._disk_pid != os.getpid():
+            # One connection shared by all threads of a process; every use is under self._disk_lock
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk_pid = os.getpid()
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute("PRAGMA synchronous=NORMAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._disk
+
+    @staticmethod
+    def _key(key: tuple) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def get(self, key: tuple):
+        """Cached value for key (memory, then the disk backing), or None."""
+        value = self.get_memory(key)
+        return value if value is not None else self.get_disk(key)
+
+    def get_memory(self, key: tuple):
+        """Value for key if it is in memory, else None (not counted as a miss: follow up with get_disk())."""
+        k = self._key(key)
+        with self._lock:
+            item = self._entries.get(k)
+            if item is None:
+                return None
+            if item[0] >= time.time():
+                self._entries.move_to_end(k)
+                self.hits += 1
+                return item[1]
+            del self._entries[k]
+            self.expired += 1
+            return None
+
+    def get_disk(self, key: tuple):
+        """Value for key from the disk backing (then kept in memory too), or None. Blocking when disk_path is set."""
+        k = self._key(key)
+        row = None
+        if self.disk_path:
+            with self._disk_lock:
+                row = self._disk_conn().execute(
+                    "SELECT value, expires_at FROM result_cache WHERE key = ? AND expires_at >= ?", (k, time.time())
+                ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            value = json.loads(row[0])
+            self._insert(k, row[1], value)
+            self.disk_hits += 1
+            return value
+
+    def put(self, key: tuple, value) -> None:
+        self.put_memory(key, value)
+        self.put_disk(key, value)
+
+    def put_memory(self, key: tuple, value) -> None:
+        with self._lock:
+            self._insert(self._key(key), time.time() + self.ttl, value)
+
+    def put_disk(self, key: tuple, value) -> None:
+        """Write key to the disk backing, if any. Blocking (an SQLite commit) when disk_path is set."""
+        if not self.disk_path:
+            return
+        data = json.dumps(value, separators=(",", ":"))
+        with self._disk_lock:
+            disk = self._disk_conn()
+            disk.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (self._key(key), data, time.time() + self.ttl),
+            )
+            self._puts += 1
+            if self._puts % PRUNE_EVERY == 0:
+                disk.execute("DELETE FROM result_cache WHERE expires_at < ?", (time.time(),))
+            disk.commit()
+
+    def _insert(self, k: str, expires_at: float, value) -> None:
+        self._entries[k] = (expires_at, value)
+        self._entries.move_to_end(k)
+        while self.max_entries > 0 and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        with self._disk_lock:
+            disk = self._disk_conn()
+            if disk is not None:
+                disk.execute("DELETE FROM result_cache")
+                disk.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.max_entries,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "diskPath": self.disk_path or None,
+            }
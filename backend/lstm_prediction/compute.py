@@ -0,0 +1,80 @@
+"""
+Dedicated executor for CPU-bound inference, separate from the DB I/O executor (db.py).
+LSTM_COMPUTE_WORKERS threads run forward passes; at most LSTM_INFERENCE_MAX_QUEUE forecasts may be queued
+or running at once (a batch request holds one slot per forecast it computes). Past that, admit() raises Overloaded and the API answers 503 with Retry-After, so long
+forecasts back off instead of piling up behind each other and delaying cheap requests.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+COMPUTE_WORKERS = int(os.environ.get("LSTM_COMPUTE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+MAX_QUEUE = int(os.environ.get("LSTM_INFERENCE_MAX_QUEUE", "64"))
+RETRY_AFTER = int(os.environ.get("LSTM_RETRY_AFTER", "2"))  # seconds, sent with 503
+TORCH_THREADS = int(os.environ.get("LSTM_TORCH_THREADS", "0"))  # intra-op threads per process; 0 = torch default
+
+
+def set_torch_threads(threads: int = TORCH_THREADS) -> None:
+    """Cap torch's intra-op threads, so N server workers do not each start one thread per core."""
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+
+
+class Overloaded(Exception):
+    """The inference queue is full; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int = RETRY_AFTER):
+        super().__init__("Inference queue is full, retry later")
+        self.retry_after = retry_after
+
+
+class ComputePool:
+    """Bounded thread pool for inference. admit() reserves queue slots; run() admits a job and runs it."""
+
+    def __init__(self, workers: int = COMPUTE_WORKERS, max_queue: int = MAX_QUEUE, retry_after: int = RETRY_AFTER):
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @contextmanager
+    def admit(self, n: int = 1):
+        """Hold n queue slots for the duration of the block, or raise Overloaded if they are not free.
+        n is capped at max_queue, so a job bigger than the whole queue is admitted only when the queue is empty."""
+        n = min(max(1, n), self.max_queue)
+        with self._lock:
+            if self.pending + n > self.max_queue:
+                self.rejected += 1
+                raise Overloaded(self.retry_after)
+            self.pending += n
+            self.admitted += 1
+            self.peak = max(self.peak, self.pending)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.pending -= n
+
+    async def run(self, fn, *args, slots: int = 1):
+        """Run fn(*args) on the compute executor, holding `slots` queue slots (one per forecast it computes)."""
+        with self.admit(slots):
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "maxQueue": self.max_queue,
+                "pending": self.pending,
+                "peakPending": self.peak,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,104 @@
+"""
+Shared read-only SQLite access for the prediction API.
+One connection per thread, opened once with mode=ro and tuned pragmas (mmap, page cache, query_only)
+and a prepared-statement cache, instead of sqlite3.connect() + close() on every request.
+WAL is a persistent property of the database file; load_data_into_db.py switches it on, so readers
+never block on (or get blocked by) an ingest in progress.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+CACHE_SIZE_KIB = int(os.environ.get("SQLITE_CACHE_SIZE_KIB", str(64 * 1024)))  # page cache per connection
+CACHED_STATEMENTS = 256  # prepared statements kept per connection (sqlite3 statement cache)
+IO_WORKERS = int(os.environ.get("DB_IO_WORKERS", "8"))
+
+
+class ReadOnlyPool:
+    """Per-thread read-only connections to one SQLite file. Reopens them if the file is replaced."""
+
+    def __init__(self, db_path: Path, io_workers: int = IO_WORKERS):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: list = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.io_workers = io_workers
+
+    def _file_id(self):
+        try:
+            st = self.db_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def _open(self) -> sqlite3.Connection:
+        uri = self.db_path.resolve().as_uri() + "?mode=ro"
+        # Each connection is only used by the thread that opened it; check_same_thread=False lets close_all() close it.
+        conn = sqlite3.connect(uri, uri=True, cached_statements=CACHED_STATEMENTS, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection, or None if the database file does not exist."""
+        file_id = self._file_id()
+        if file_id is None:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid != os.getpid():
+            # Inherited through fork (app.py --preload): never use or close the parent's connection here
+            with self._lock:
+                self._all = []
+            conn = None
+        if conn is not None and self._local.file_id == file_id:
+            return conn
+        if conn is not None:
+            self._discard(conn)
+        conn = self._open()
+        self._local.conn, self._local.file_id, self._local.pid = conn, file_id, os.getpid()
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        conn.close()
+
+    def fetchall(self, sql: str, params=()) -> list:
+        """Run a query on this thread's connection. Returns [] if the database does not exist."""
+        conn = self.connection()
+        if conn is None:
+            return []
+        return conn.execute(sql, params).fetchall()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="db-io")
+        return self._executor
+
+    async def run(self, fn, *args):
+        """Run blocking DB work fn(*args) on the I/O executor without blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def afetchall(self, sql: str, params=()) -> list:
+        return await self.run(self.fetchall, sql, params)
+
+    def close_all(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
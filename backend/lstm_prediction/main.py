@@ -3,87 +3,242 @@ LSTM Prediction: load LSTM per commodity and return forecast.
 SmartAgri-compatible endpoints for Dashboard, Price Analysis, Predictions.
 Run from project root: python app.py  (or: uvicorn backend.lstm_prediction.main:app --reload --port 8000)
 """
+import hashlib
 import json
+import os
 import random
 import sqlite3
-from datetime import datetime, timedelta
+import sys
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 import numpy as np
 
+from .batching import InferenceBatcher
+from .cache import ResultCache
+from .compute import ComputePool, Overloaded, set_torch_threads
+from .db import ReadOnlyPool
+from .registry import ModelRegistry
+from .startup import Cached, Warmup, mtime_signature
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "crop_prices.db"
 MODELS_DIR = PROJECT_ROOT / "data" / "models"
+PARQUET_DIR = PROJECT_ROOT / "data" / "crop_prices_parquet"
 LOOKBACK = 60
-
-# Commodity aliases for DB lookup (same as train_lstm)
-COMMODITY_ALIASES = {
-    "Rice": ["Rice", "Paddy (Dhan)(Common)", "Paddy (Dhan)"],
-    "Gram": ["Gram", "Bengal Gram (Gram)(Whole)"],
-    "Arhar": ["Arhar", "Arhar (Tur)(Whole)", "Tur (Arhar)"],
-    "Bajra": ["Bajra", "Bajra (Pearl Millet/Cumbu)"],
-    "Jowar": ["Jowar", "Jowar (Sorghum)"],
-    "Lentil": ["Lentil", "Lentil (Masur)(Whole)"],
-    "Moong": ["Moong", "Green Gram (Moong)(Whole)"],
-    "Urad": ["Urad", "Black Gram (Urd Beans)(Whole)"],
-    "Soybean": ["Soybean", "Soyabean"],
-    "Cardamom": ["Cardamom", "Cardamoms"],
-    "Black Pepper": ["Black Pepper", "Pepper garbled", "Pepper ungarbled"],
-    "Ginger": ["Ginger", "Ginger (Green)"],
-    "Coriander": ["Coriander", "Coriander (Leaves)", "Corriander seed"],
-}
-
-
-def get_popular_commodities():
-    path = PROJECT_ROOT / "scripts" / "popular_commodities.py"
-    with open(path) as f:
+BATCH_MAX_ITEMS = 200  # max {commodity, days} entries per POST /api/predictions/batch
+POPULAR_PATH = PROJECT_ROOT / "scripts" / "popular_commodities.py"
+# Models loaded (with one forward pass) in the background at startup: comma-separated names,
+# "*" = every trained commodity (up to LSTM_MODEL_CACHE_SIZE), "" = none
+WARM_MODELS = os.environ.get("LSTM_WARM_MODELS", "*")
+# Opt-in: next-day forecasts of at most this many days carry the LSTM (h, c) state forward instead of
+# re-encoding the 60-day window each day. Faster, but not what the model was trained on: trained models drift
+# from the windowed forecast as the horizon grows, so only set it to a horizon checked on your models. 0 = off.
+CARRY_STATE_DAYS = int(os.environ.get("LSTM_CARRY_STATE_DAYS", "0"))
+
+# Per-thread read-only connections (mode=ro, mmap, statement cache) shared by all handlers
+db = ReadOnlyPool(DB_PATH)
+
+# Loaded models stay in memory between requests (LRU; reloaded when the .pt/_scaler.json change)
+registry = ModelRegistry(MODELS_DIR)
+
+# Forward passes run here, not on the DB I/O executor; a full queue answers 503 + Retry-After
+# (LSTM_COMPUTE_WORKERS / LSTM_INFERENCE_MAX_QUEUE / LSTM_RETRY_AFTER)
+compute = ComputePool()
+
+# Finished forecasts, keyed on model digest + data version (LSTM_FORECAST_CACHE_SIZE / _TTL / _DB)
+forecast_cache = ResultCache()
+
+# Serialized graph responses + their ETags, keyed on data version (LSTM_GRAPH_CACHE_SIZE / _TTL)
+graph_cache = ResultCache(
+    max_entries=int(os.environ.get("LSTM_GRAPH_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("LSTM_GRAPH_CACHE_TTL", "600")),
+    disk_path=None,
+)
+# Browsers / gateway may reuse a graph for max-age seconds, then revalidate with If-None-Match (-> 304)
+GRAPH_CACHE_CONTROL = os.environ.get("LSTM_GRAPH_CACHE_CONTROL", "public, max-age=60, must-revalidate")
+
+
+def _read_popular_commodities():
+    with open(POPULAR_PATH) as f:
         ns = {}
         exec(f.read(), ns)
     return ns["POPULAR_COMMODITIES"]
 
 
-def get_trained_crops() -> List[str]:
-    """Return list of crop names that have trained models (.pt + _scaler.json)."""
+def _scan_trained_crops() -> List[str]:
     if not MODELS_DIR.exists():
         return []
-    crops = []
+    crops = registry.global_commodities()
     for f in MODELS_DIR.glob("*.pt"):
         safe = f.stem
         crop_name = safe.replace("_", " ")
         scaler_path = MODELS_DIR / f"{safe}_scaler.json"
         if scaler_path.exists():
             crops.append(crop_name)
-    return sorted(crops)
+    return sorted(set(crops))
+
+
+# Built once, rebuilt when popular_commodities.py / the models directory / the global model's meta change
+_popular = Cached(_read_popular_commodities, lambda: mtime_signature(POPULAR_PATH))
+_trained = Cached(_scan_trained_crops, lambda: mtime_signature(MODELS_DIR, registry.global_paths()[1]))
+
+
+def get_popular_commodities():
+    return list(_popular.get())
+
+
+def get_trained_crops() -> List[str]:
+    """Return list of crop names that have trained models (.pt + _scaler.json, or an entry in the global model)."""
+    return list(_trained.get())
+
+
+def preload_models() -> int:
+    """Load the national model of every trained commodity (and the global model) into the registry,
+    e.g. before app.py --preload forks its workers. Returns how many commodities have a model loaded."""
+    return sum(registry.get(c) is not None for c in get_trained_crops())
+
 
+# Prices are read from the daily_commodity_prices rollup (load_data_into_db.py), keyed by canonical
+# commodity; an archive alias (e.g. "Soyabean") is resolved to its canonical name via commodities
+_CANONICAL = "COALESCE((SELECT canonical FROM commodities WHERE name = ?), ?)"
 
-def _commodity_aliases(commodity: str) -> List[str]:
-    return [commodity] + COMMODITY_ALIASES.get(commodity, [])
 
+def _scripts_path() -> None:
+    scripts_dir = str(PROJECT_ROOT / "scripts")
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
 
-def load_last_prices(commodity: str, days: int = LOOKBACK) -> List[Tuple[str, float]]:
-    """Return list of (date_str, modal_price) for last `days` days, sorted by date."""
+
+def _columnar_store():
+    """scripts/columnar_store.py when there is no DB but a Parquet copy (merge_all_crops.py --parquet), else None."""
+    if DB_PATH.exists() or not PARQUET_DIR.exists():
+        return None
+    _scripts_path()
+    import columnar_store
+    return columnar_store if columnar_store.available(PARQUET_DIR) else None
+
+
+def _has_rollup() -> bool:
+    """True if crop_prices.db has the daily_commodity_prices rollup. A DB built by an older load_data_into_db.py
+    only has crop_prices; it is read with the per-request aggregate below (slower) until it is reloaded.
+    Checked once per data_version()."""
+    return _rollup.get()
+
+
+_rollup = Cached(
+    lambda: bool(db.fetchall("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_commodity_prices'")),
+    lambda: (data_version(),),
+)
+
+
+def _legacy_prices(commodity: str, state: str, district: str, cutoff: Optional[str] = None,
+                   limit: Optional[int] = None, newest_first: bool = False) -> list:
+    """[(date, modal, min, max)] averaged per day over crop_prices (no rollup), matching the commodity's aliases."""
+    _scripts_path()
+    from popular_commodities import COMMODITY_ALIASES, canonical_commodity
+
+    name = canonical_commodity(commodity)
+    aliases = list(dict.fromkeys([commodity, name] + COMMODITY_ALIASES.get(name, [])))
+    query = f"""
+        SELECT date, AVG(modal_price), AVG(min_price), AVG(max_price)
+        FROM crop_prices
+        WHERE commodity IN ({",".join("?" * len(aliases))}) AND modal_price IS NOT NULL AND modal_price > 0
+    """
+    params: list = list(aliases)
+    for condition, value in (("state = ?", state), ("district = ?", district), ("date >= ?", cutoff)):
+        if value:
+            query += f" AND {condition}"
+            params.append(value)
+    query += f" GROUP BY date ORDER BY date {'DESC' if newest_first else 'ASC'}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    try:
+        return db.fetchall(query, params)
+    except sqlite3.OperationalError:  # no crop_prices either (empty DB file)
+        return []
+
+
+def _region(state: Optional[str], district: Optional[str]) -> Tuple[str, str]:
+    """Normalize a request's (state, district): "All India" / "All districts" / blank -> "" (national / whole state).
+    A district only counts together with its state."""
+    state = (state or "").strip()
+    district = (district or "").strip()
+    if state.lower() in ("", "all india"):
+        return "", ""
+    if district.lower() in ("", "all districts"):
+        district = ""
+    return state, district
+
+
+def data_version() -> int:
+    """Changes whenever the price data does: crop_prices.db's PRAGMA user_version (bumped by
+    load_data_into_db.py after every load), or the Parquet copy's version marker."""
+    store = _columnar_store()
+    if store is not None:
+        return store.version(PARQUET_DIR)
+    rows = db.fetchall("PRAGMA user_version")
+    return rows[0][0] if rows else 0
+
+
+def load_last_prices(commodity: str, days: int = LOOKBACK, state: str = "", district: str = "") -> List[Tuple[str, float]]:
+    """Return list of (date_str, modal_price) for last `days` days, sorted by date.
+    National average by default; state (and district) select that rollup level instead."""
+    store = _columnar_store()
+    if store is not None:
+        rows = store.daily_prices(commodity, state=state or None, district=district or None, dataset_dir=PARQUET_DIR)
+        return [(d, m) for d, m, _, _ in rows[-days:]]
     if not DB_PATH.exists():
         return []
-    aliases = _commodity_aliases(commodity)
-    placeholders = ",".join("?" * len(aliases))
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.execute(
+    if not _has_rollup():
+        rows = _legacy_prices(commodity, state, district, limit=days, newest_first=True)
+        return [(r[0], float(r[1])) for r in reversed(rows)]
+    rows = db.fetchall(
         f"""
-        SELECT date, AVG(modal_price) AS modal_price
-        FROM crop_prices
-        WHERE commodity IN ({placeholders}) AND modal_price IS NOT NULL AND modal_price > 0
-        GROUP BY date
+        SELECT date, modal_price
+        FROM daily_commodity_prices
+        WHERE commodity = {_CANONICAL} AND state = ? AND district = ?
         ORDER BY date DESC
         LIMIT ?
         """,
-        (*aliases, days),
+        (commodity, commodity, state, district, days),
     )
-    rows = cur.fetchall()
-    conn.close()
     return [(r[0], float(r[1])) for r in reversed(rows)]
 
 
+def load_last_prices_many(commodities: List[str], days: int = LOOKBACK) -> Dict[str, List[Tuple[str, float]]]:
+    """Same as load_last_prices() for several commodities in one query. Returns {commodity: [(date_str, modal_price), ...]}."""
+    commodities = list(dict.fromkeys(commodities))
+    result: Dict[str, List[Tuple[str, float]]] = {c: [] for c in commodities}
+    if _columnar_store() is not None:
+        return {c: load_last_prices(c, days) for c in commodities}
+    if not DB_PATH.exists() or not commodities:
+        return result
+    if not _has_rollup():
+        return {c: load_last_prices(c, days) for c in commodities}
+    values = ",".join("(?)" for _ in commodities)
+    rows = db.fetchall(
+        f"""
+        WITH req(commodity) AS (VALUES {values}),
+        ranked AS (
+            SELECT r.commodity, d.date, d.modal_price,
+                   ROW_NUMBER() OVER (PARTITION BY r.commodity ORDER BY d.date DESC) AS rn
+            FROM req r
+            JOIN daily_commodity_prices d
+              ON d.commodity = COALESCE((SELECT canonical FROM commodities WHERE name = r.commodity), r.commodity)
+             AND d.state = '' AND d.district = ''
+        )
+        SELECT commodity, date, modal_price FROM ranked WHERE rn <= ? ORDER BY commodity, date
+        """,
+        (*commodities, days),
+    )
+    for commodity, date, price in rows:
+        result[commodity].append((date, float(price)))
+    return result
+
+
 _SAMPLE_BASE_PRICES = {
     "Rice": 2200, "Wheat": 1950, "Maize": 1800, "Bajra": 2100, "Jowar": 2350,
     "Gram": 5500, "Lentil": 6200, "Moong": 7200, "Urad": 8500, "Arhar": 11500,
@@ -131,35 +286,68 @@ def _generate_sample_graph_data(crop: str, days: int) -> dict:
 
 
 def get_graph_data(crop: str, state: Optional[str] = None, district: Optional[str] = None, days: int = 30) -> dict:
-    """Query DB for price graph data. Falls back to sample data if DB missing or empty."""
+    """Query DB (or the Parquet copy) for price graph data. Falls back to sample data if both are missing or empty."""
+    cutoff = (datetime.now() - timedelta(days=int(days))).strftime("%Y-%m-%d")
+    store = _columnar_store()
+    if store is not None:
+        rows = store.daily_prices(crop, start=cutoff, state=state, district=district, dataset_dir=PARQUET_DIR)[:400]
+        return _graph_response(crop, state, district, days, rows)
     if not DB_PATH.exists():
         return _generate_sample_graph_data(crop, min(days, 30))
-    aliases = _commodity_aliases(crop)
-    placeholders = ",".join("?" * len(aliases))
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cutoff = (datetime.now() - timedelta(days=int(days))).strftime("%Y-%m-%d")
-    query = f"""
-        SELECT date, AVG(modal_price) AS modal_price, AVG(min_price) AS min_price, AVG(max_price) AS max_price
-        FROM crop_prices
-        WHERE commodity IN ({placeholders}) AND modal_price IS NOT NULL AND modal_price > 0
-          AND date >= ?
-    """
-    params: list = list(aliases) + [cutoff]
-    if state:
-        query += " AND state = ?"
-        params.append(state)
-    if district:
-        query += " AND district = ?"
-        params.append(district)
-    query += """
-        GROUP BY date
-        ORDER BY date ASC
-        LIMIT 400
-    """
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
+    if not _has_rollup():
+        return _graph_response(crop, state, district, days, _legacy_prices(crop, state or "", district or "", cutoff, 400))
+    if district and not state:
+        # District name alone: combine the matching (state, district) rows, weighted by record count
+        query = f"""
+            SELECT date, SUM(modal_price * n_records) / SUM(n_records) AS modal_price,
+                   SUM(min_price * n_records) / SUM(n_records) AS min_price,
+                   SUM(max_price * n_records) / SUM(n_records) AS max_price
+            FROM daily_commodity_prices
+            WHERE commodity = {_CANONICAL} AND state <> '' AND district = ? AND date >= ?
+            GROUP BY date
+            ORDER BY date ASC
+            LIMIT 400
+        """
+        params: list = [crop, crop, district, cutoff]
+    else:
+        query = f"""
+            SELECT date, modal_price, min_price, max_price
+            FROM daily_commodity_prices
+            WHERE commodity = {_CANONICAL} AND state = ? AND district = ? AND date >= ?
+            ORDER BY date ASC
+            LIMIT 400
+        """
+        params = [crop, crop, state or "", (district or "") if state else "", cutoff]
+    return _graph_response(crop, state, district, days, db.fetchall(query, params))
+
+
+def graph_payload(crop: str, state: Optional[str] = None, district: Optional[str] = None, days: int = 30) -> list:
+    """[ETag, JSON body, success] for get_graph_data(), cached per (crop, state, district, days, data version, day).
+    The body is serialized once; the strong ETag is a hash of it."""
+    key = ("graph", crop, state or "", district or "", int(days), data_version(), date.today().isoformat())
+    cached = graph_cache.get(key)
+    if cached is not None:
+        return cached
+    result = get_graph_data(crop, state, district, days)
+    # Same bytes as FastAPI's JSONResponse
+    body = json.dumps(result, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    payload = ['"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"', body, bool(result.get("success"))]
+    graph_cache.put(key, payload)
+    return payload
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (handles lists, W/ prefixes and *)."""
+    if not if_none_match:
+        return False
+    for tag in (t.strip() for t in if_none_match.split(",")):
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+def _graph_response(crop: str, state: Optional[str], district: Optional[str], days: int, rows: list) -> dict:
+    """Build the graph payload from [(date, modal, min, max)] rows sorted by date."""
     if not rows:
         return _generate_sample_graph_data(crop, min(days, 30))
     valid_prices = [r[1] for r in rows if r[1] and r[1] > 0]
@@ -203,35 +391,91 @@ def get_graph_data(crop: str, state: Optional[str] = None, district: Optional[st
     }
 
 
-def predict(commodity: str, days_ahead: int) -> dict:
-    """Load model and scaler, get last 60 days, predict next days_ahead. Return dict with predictions list."""
-    safe = commodity.replace(" ", "_")
-    model_path = MODELS_DIR / f"{safe}.pt"
-    scaler_path = MODELS_DIR / f"{safe}_scaler.json"
-    if not model_path.exists() or not scaler_path.exists():
-        return {"error": f"No trained model for {commodity}"}
-    last = load_last_prices(commodity, LOOKBACK)
-    if len(last) < LOOKBACK:
-        return {"error": f"Need at least {LOOKBACK} days of data for {commodity}"}
-
+def _rollout(entry, windows: np.ndarray, days_ahead: int, ids: Optional[List[int]] = None) -> np.ndarray:
+    """Forecast days_ahead scaled values after each scaled window. windows: (batch, LOOKBACK) -> (batch, days_ahead).
+    Each forward pass re-encodes the latest LOOKBACK days (predictions fed back in), as in training; direct models
+    emit `horizon` days per pass, next-day models one. With LSTM_CARRY_STATE_DAYS, next-day forecasts up to that
+    many days instead warm up once on the window and carry the LSTM (h, c) state forward.
+    ids: per-row commodity ids for the global model (rows may be different commodities), else None."""
     import torch
-    import sys
-    sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
-    from lstm_model import LSTMModel
 
-    with open(scaler_path) as f:
-        scaler = json.load(f)
-    min_val, max_val = scaler["min"], scaler["max"]
-    values = np.array([p[1] for p in last], dtype=np.float32)
-    scaled = (values - min_val) / (max_val - min_val) if max_val > min_val else values * 0
+    model = entry.model
+    batch = len(windows)
+    extra = () if ids is None else (torch.as_tensor(ids, dtype=torch.long),)
+    window = torch.from_numpy(np.ascontiguousarray(windows, dtype=np.float32).reshape(batch, LOOKBACK, 1))
+    with torch.no_grad():
+        if entry.horizon == 1 and days_ahead <= CARRY_STATE_DAYS:
+            outs = torch.empty(batch, days_ahead)
+            out, state = model.step(window, *extra)
+            outs[:, 0] = out
+            for i in range(1, days_ahead):
+                out, state = model.step(out.reshape(batch, 1, 1), *extra, state=state)
+                outs[:, i] = out
+            return outs.numpy()
+        seq = np.empty((batch, LOOKBACK + days_ahead + entry.horizon), dtype=np.float32)
+        seq[:, :LOOKBACK] = window.reshape(batch, LOOKBACK).numpy()
+        n = LOOKBACK
+        while n < LOOKBACK + days_ahead:
+            x = torch.from_numpy(np.ascontiguousarray(seq[:, n - LOOKBACK : n]).reshape(batch, LOOKBACK, 1))
+            seq[:, n : n + entry.horizon] = model(x, *extra).reshape(batch, entry.horizon).numpy()
+            n += entry.horizon
+    return seq[:, LOOKBACK : LOOKBACK + days_ahead]
+
+
+def _prepare(commodity: str, state: str = "", district: str = ""):
+    """Blocking part of a forecast: DB read + model lookup. Returns (entry, last prices, scaled window, (state, district)
+    actually used, data version) or an error dict. Falls back district -> state -> national to the first level that
+    has both a model and LOOKBACK days of prices at that level."""
+    version = data_version()
+    levels = list(dict.fromkeys([(state, district), (state, ""), ("", "")]))
+    error = None
+    for level in levels:
+        if registry.resolve(commodity, *level) is None:
+            error = error or {"error": f"No trained model for {commodity}"}
+            continue
+        last = load_last_prices(commodity, LOOKBACK, *level)
+        if len(last) < LOOKBACK:
+            error = {"error": f"Need at least {LOOKBACK} days of data for {commodity}"}
+            continue
+        entry = registry.get(commodity, *level)
+        if entry is None:
+            error = error or {"error": f"No trained model for {commodity}"}
+            continue
+        min_val, max_val = entry.min_val, entry.max_val
+        values = np.array([p[1] for p in last[-LOOKBACK:]], dtype=np.float32)
+        scaled = (values - min_val) / (max_val - min_val) if max_val > min_val else values * 0
+        return entry, last, scaled, level, version
+    return error
+
+
+def _forecast_key(commodity: str, level: Tuple[str, str], days_ahead: int, entry, last, version: int) -> tuple:
+    """Forecast cache key: a new ingest (data version, latest date) or retrained model (digest) gives a new key."""
+    return ("forecast", commodity, *level, days_ahead, entry.digest, version, last[-1][0])
+
+
+def load_precomputed(commodity: str, days_ahead: int, entry, last, version: int) -> Optional[dict]:
+    """National forecast from the forecasts table (scripts/precompute_forecasts.py), if it was made by this
+    model (digest) from this data (version, latest date) and covers days_ahead days; else None."""
+    if not DB_PATH.exists():
+        return None
+    try:
+        rows = db.fetchall(
+            """
+            SELECT predictions FROM forecasts
+            WHERE commodity = ? AND model_digest = ? AND data_version = ? AND last_date = ? AND days >= ?
+            """,
+            (commodity, entry.digest, version, last[-1][0], days_ahead),
+        )
+    except sqlite3.OperationalError:  # no forecasts table (precompute_forecasts.py not run yet)
+        return None
+    if not rows:
+        return None
+    return {"commodity": commodity, "predictions": json.loads(rows[0][0])[:days_ahead]}
 
-    device = torch.device("cpu")
-    model = LSTMModel()
-    model.load_state_dict(torch.load(model_path, map_location=device))
-    model.eval()
 
+def _format_predictions(commodity: str, entry, last: List[Tuple[str, float]], outs: np.ndarray) -> dict:
+    min_val, max_val = entry.min_val, entry.max_val
     preds = []
-    seq = scaled.copy()
     last_date_str = last[-1][0].strip()[:10]
     last_date = None
     for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
@@ -242,25 +486,193 @@ def predict(commodity: str, days_ahead: int) -> dict:
             continue
     if last_date is None:
         last_date = datetime.now()
-    with torch.no_grad():
-        for _ in range(days_ahead):
-            x = torch.from_numpy(seq[-LOOKBACK:].reshape(1, LOOKBACK, 1)).float().to(device)
-            out = model(x).item()
-            pred_val = out * (max_val - min_val) + min_val if max_val > min_val else out
-            last_date += timedelta(days=1)
-            preds.append({"date": last_date.strftime("%Y-%m-%d"), "modal_price": round(pred_val, 2)})
-            seq = np.append(seq, out)
+    for out in outs.tolist():
+        pred_val = out * (max_val - min_val) + min_val if max_val > min_val else out
+        last_date += timedelta(days=1)
+        preds.append({"date": last_date.strftime("%Y-%m-%d"), "modal_price": round(pred_val, 2)})
 
     return {"commodity": commodity, "predictions": preds}
 
 
+def _with_region(result: dict, state: str, level: Tuple[str, str]) -> dict:
+    """For regional requests, report which level's model and prices produced the forecast."""
+    if state:
+        result["region"] = {"state": level[0] or "All India", "district": level[1] or "All districts"}
+    return result
+
+
+def predict(commodity: str, days_ahead: int, state: Optional[str] = None, district: Optional[str] = None) -> dict:
+    """Get model and scaler from the registry, last 60 days from DB, predict next days_ahead. Return dict with predictions list.
+    A matching precomputed national forecast (forecasts table) is served without running the model.
+    With state/district, the most specific regional model (and that region's prices) is used, falling back to the parent level."""
+    state, district = _region(state, district)
+    prepared = _prepare(commodity, state, district)
+    if isinstance(prepared, dict):
+        return prepared
+    entry, last, scaled, level, version = prepared
+    key = _forecast_key(commodity, level, days_ahead, entry, last, version)
+    result = forecast_cache.get(key)
+    if result is None and level == ("", ""):
+        result = load_precomputed(commodity, days_ahead, entry, last, version)
+        if result is not None:
+            forecast_cache.put(key, result)
+    if result is None:
+        ids = None if entry.commodity_id is None else [entry.commodity_id]
+        outs = _rollout(entry, scaled.reshape(1, LOOKBACK), days_ahead, ids)[0]
+        result = _format_predictions(commodity, entry, last, outs)
+        forecast_cache.put(key, result)
+    return _with_region(dict(result), state, level)
+
+
+def _plan_many(items: List[Tuple[str, int]]) -> Tuple[List[Optional[dict]], Dict[int, list], int]:
+    """I/O half of predict_many(): one DB query for all histories, model lookups, cached / precomputed results.
+    Returns (results with None where inference is still needed, groups to run, data version)."""
+    version = data_version()
+    last_by_commodity = load_last_prices_many([c for c, _ in items], LOOKBACK)
+    results: List[Optional[dict]] = [None] * len(items)
+    groups: Dict[int, list] = {}  # id(entry.model) -> [(item index, entry, last, scaled, days)]
+    for i, (commodity, days_ahead) in enumerate(items):
+        last = last_by_commodity.get(commodity, [])
+        entry = registry.get(commodity)
+        if entry is None:
+            results[i] = {"error": f"No trained model for {commodity}"}
+            continue
+        if len(last) < LOOKBACK:
+            results[i] = {"error": f"Need at least {LOOKBACK} days of data for {commodity}"}
+            continue
+        key = _forecast_key(commodity, ("", ""), days_ahead, entry, last, version)
+        results[i] = forecast_cache.get(key)
+        if results[i] is None:
+            results[i] = load_precomputed(commodity, days_ahead, entry, last, version)
+            if results[i] is not None:
+                forecast_cache.put(key, results[i])
+        if results[i] is not None:
+            continue
+        values = np.array([p[1] for p in last], dtype=np.float32)
+        span = entry.max_val - entry.min_val
+        scaled = (values - entry.min_val) / span if span > 0 else values * 0
+        groups.setdefault(id(entry.model), []).append((i, entry, last, scaled, days_ahead))
+    return results, groups, version
+
+
+def _run_many(items: List[Tuple[str, int]], results: List[Optional[dict]], groups: Dict[int, list], version: int) -> List[dict]:
+    """Compute half of predict_many(): one batched rollout per loaded model; fills in and returns results."""
+    for group in groups.values():
+        first = group[0][1]
+        ids = None if first.commodity_id is None else [g[1].commodity_id for g in group]
+        outs = _rollout(first, np.stack([g[3] for g in group]), max(g[4] for g in group), ids)
+        for (i, entry, last, _, days_ahead), row in zip(group, outs):
+            results[i] = _format_predictions(items[i][0], entry, last, row[:days_ahead])
+            forecast_cache.put(_forecast_key(items[i][0], ("", ""), days_ahead, entry, last, version), results[i])
+    return results
+
+
+def predict_many(items: List[Tuple[str, int]]) -> List[dict]:
+    """Forecast several (commodity, days_ahead) items: one DB query for all histories, then one
+    batched rollout per loaded model (one for all commodities served by the global model).
+    Returns one predict()-style dict per item, in order."""
+    return _run_many(items, *_plan_many(items))
+
+
+async def predict_many_async(items: List[Tuple[str, int]]) -> List[dict]:
+    """predict_many() with the DB work on the I/O executor and the rollouts on the compute executor.
+    The batch holds one compute queue slot per forecast it computes, like that many single requests would."""
+    results, groups, version = await db.run(_plan_many, items)
+    if not groups:
+        return results
+    slots = sum(len(group) for group in groups.values())
+    return await compute.run(_run_many, items, results, groups, version, slots=slots)
+
+
+def warm_up() -> dict:
+    """Startup warmup (runs in the background): import torch, then load each LSTM_WARM_MODELS model and run
+    one forward pass, so the first requests do not pay for either."""
+    set_torch_threads()
+    import torch  # noqa: F401  (the slow part of a cold start)
+
+    names = [c.strip() for c in WARM_MODELS.split(",") if c.strip()]
+    if names == ["*"]:
+        names = get_trained_crops()
+    if registry.max_models > 0:
+        names = names[: registry.max_models]
+    warmed = []
+    for commodity in names:
+        entry = registry.get(commodity)
+        if entry is None:
+            continue
+        ids = None if entry.commodity_id is None else [entry.commodity_id]
+        _rollout(entry, np.zeros((1, LOOKBACK), dtype=np.float32), 1, ids)
+        warmed.append(commodity)
+    return {"warmModels": warmed}
+
+
+warmup = Warmup(warm_up)
+
+
+def _precomputed(key: tuple, commodity: str, days_ahead: int, entry, last, version: int,
+                 level: Tuple[str, str]) -> Optional[dict]:
+    """National forecast from the precomputed forecasts table (then cached), or None. Blocking."""
+    if level != ("", ""):
+        return None
+    result = load_precomputed(commodity, days_ahead, entry, last, version)
+    if result is not None:
+        forecast_cache.put(key, result)
+    return result
+
+
+def _cached_or_precomputed(key: tuple, *args) -> Optional[dict]:
+    """Blocking lookups after a memory miss, for the I/O executor: the forecast cache's disk backing, then
+    _precomputed(key, *args)."""
+    result = forecast_cache.get_disk(key)
+    return result if result is not None else _precomputed(key, *args)
+
+
+async def predict_batched(commodity: str, days_ahead: int, batcher: InferenceBatcher,
+                          state: Optional[str] = None, district: Optional[str] = None) -> dict:
+    """Same as predict(), but the forward pass is shared with concurrent requests for the same model
+    (for the global model: with concurrent requests for any commodity)."""
+    state, district = _region(state, district)
+    prepared = await db.run(_prepare, commodity, state, district)
+    if isinstance(prepared, dict):
+        return prepared
+    entry, last, scaled, level, version = prepared
+    key = _forecast_key(commodity, level, days_ahead, entry, last, version)
+    result = forecast_cache.get_memory(key)
+    if result is None:
+        lookup = (key, commodity, days_ahead, entry, last, version, level)
+        if forecast_cache.disk_path:
+            result = await db.run(_cached_or_precomputed, *lookup)
+        else:
+            forecast_cache.get_disk(key)  # no disk backing: no I/O, only counts the miss
+            if level == ("", ""):
+                result = await db.run(_precomputed, *lookup)
+    if result is None:
+        with compute.admit():
+            outs = await batcher.submit(entry, scaled, days_ahead)
+        result = _format_predictions(commodity, entry, last, outs)
+        forecast_cache.put_memory(key, result)
+        if forecast_cache.disk_path:
+            await db.run(forecast_cache.put_disk, key, result)
+    return _with_region(dict(result), state, level)
+
+
 # FastAPI app (SmartAgri-compatible)
 def create_app():
-    from fastapi import FastAPI, HTTPException
+    from contextlib import asynccontextmanager
+
+    from fastapi import FastAPI, HTTPException, Request, Response
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
     from pydantic import BaseModel
 
-    app = FastAPI(title="LSTM Crop Price Prediction")
+    @asynccontextmanager
+    async def lifespan(app):
+        # Start serving at once; torch and the hot models load in the background (/healthz/ready)
+        warmup.start()
+        yield
+        db.close_all()
+
+    app = FastAPI(title="LSTM Crop Price Prediction", lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:3000", "http://localhost:5173", "http://127.0.0.1:3000", "http://127.0.0.1:5173"],
@@ -268,41 +680,116 @@ def create_app():
         allow_headers=["*"],
     )
 
+    # Concurrent forecasts for the same model share one batched forward pass on the compute executor
+    # (LSTM_BATCH_MAX_WAIT_MS / LSTM_BATCH_MAX_SIZE)
+    batcher = InferenceBatcher(_rollout, executor=compute.executor)
+
+    @app.exception_handler(Overloaded)
+    async def overloaded_handler(request: Request, exc: Overloaded):
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "message": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.get("/healthz/ready")
+    async def healthz_ready():
+        """200 once startup warmup has finished, 503 (with Retry-After) while it is still running."""
+        status = {**warmup.status(), "loadedModels": registry.stats()["size"]}
+        if not warmup.ready:
+            return JSONResponse(status_code=503, content=status, headers={"Retry-After": "1"})
+        return status
+
     @app.get("/predict")
-    def get_predict(commodity: str, days: int = 7):
+    async def get_predict(commodity: str, days: int = 7, state: Optional[str] = None, district: Optional[str] = None):
         if days < 1 or days > 30:
             days = 7
-        return predict(commodity, days)
+        return await predict_batched(commodity, days, batcher, state, district)
 
     @app.get("/commodities")
-    def list_commodities():
-        return {"commodities": get_popular_commodities()}
+    async def list_commodities():
+        return {"commodities": await db.run(get_popular_commodities)}
 
     # --- SmartAgri-compatible routes (under /api) ---
 
     @app.get("/api/crops/popular")
-    def api_crops_popular():
-        return {"success": True, "data": get_popular_commodities()}
+    async def api_crops_popular():
+        return {"success": True, "data": await db.run(get_popular_commodities)}
 
     @app.get("/api/crops/trained")
-    def api_crops_trained():
+    async def api_crops_trained():
         """Return only crops that have trained LSTM models."""
-        return {"success": True, "data": get_trained_crops()}
+        return {"success": True, "data": await db.run(get_trained_crops)}
+
+    @app.get("/api/models/stats")
+    async def api_models_stats():
+        """Model registry counters (hits, misses, load time) to confirm models stay loaded."""
+        return {"success": True, "data": registry.stats()}
+
+    @app.get("/api/forecasts/cache/stats")
+    async def api_forecast_cache_stats():
+        """Forecast cache counters (hits, disk hits, misses, evictions)."""
+        return {"success": True, "data": forecast_cache.stats()}
+
+    @app.get("/api/graphs/cache/stats")
+    async def api_graph_cache_stats():
+        return {"success": True, "data": graph_cache.stats()}
+
+    @app.get("/api/inference/stats")
+    async def api_inference_stats():
+        """Micro-batching counters, including the batch-size histogram, and the compute queue."""
+        return {"success": True, "data": {**batcher.stats(), "compute": compute.stats()}}
+
+    async def graph_http(request: Request, crop_name: str, state: Optional[str], district: Optional[str], days: int):
+        etag, body, success = await db.run(graph_payload, crop_name, state, district, days)
+        if not success:
+            raise HTTPException(status_code=404, detail=json.loads(body).get("message", "No data"))
+        headers = {"ETag": etag, "Cache-Control": GRAPH_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
 
     @app.get("/api/graphs/test/{crop_name}")
-    def api_graphs_test(crop_name: str, state: Optional[str] = None, district: Optional[str] = None, days: int = 30):
-        result = get_graph_data(crop_name, state, district, days)
-        if not result.get("success"):
-            raise HTTPException(status_code=404, detail=result.get("message", "No data"))
-        return result
+    async def api_graphs_test(request: Request, crop_name: str, state: Optional[str] = None, district: Optional[str] = None, days: int = 30):
+        return await graph_http(request, crop_name, state, district, days)
 
     @app.get("/api/graphs/crop/{crop_name}")
-    def api_graphs_crop(crop_name: str, state: Optional[str] = None, district: Optional[str] = None, days: int = 30):
+    async def api_graphs_crop(request: Request, crop_name: str, state: Optional[str] = None, district: Optional[str] = None, days: int = 30):
         """Same as /api/graphs/test/{crop_name} - for SmartAgri frontend CropGraph."""
-        result = get_graph_data(crop_name, state, district, days)
-        if not result.get("success"):
-            raise HTTPException(status_code=404, detail=result.get("message", "No data"))
-        return result
+        return await graph_http(request, crop_name, state, district, days)
+
+    class BatchPredictionItem(BaseModel):
+        commodity: str
+        days: int = 7
+
+    class BatchPredictionRequest(BaseModel):
+        items: List[BatchPredictionItem]
+
+    @app.post("/api/predictions/batch")
+    async def api_predictions_batch(req: BatchPredictionRequest):
+        """Forecast many {commodity, days} items in one call; errors are reported per item."""
+        if not req.items:
+            raise HTTPException(status_code=400, detail="items is required")
+        if len(req.items) > BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per request")
+        results: List[Optional[dict]] = [None] * len(req.items)
+        todo = []
+        for i, item in enumerate(req.items):
+            commodity = item.commodity.strip()
+            if not commodity:
+                results[i] = {"commodity": item.commodity, "days": item.days, "success": False, "error": "commodity is required"}
+            elif item.days < 1 or item.days > 365:
+                results[i] = {"commodity": commodity, "days": item.days, "success": False, "error": "days must be between 1 and 365"}
+            else:
+                todo.append((i, commodity, item.days))
+        if todo:
+            outs = await predict_many_async([(c, d) for _, c, d in todo])
+            for (i, commodity, days), out in zip(todo, outs):
+                if "error" in out:
+                    results[i] = {"commodity": commodity, "days": days, "success": False, "error": out["error"]}
+                else:
+                    results[i] = {"commodity": commodity, "days": days, "success": True, "predictions": out["predictions"]}
+        return {"success": True, "results": results}
 
     class UserPredictionRequest(BaseModel):
         category: str = ""
@@ -312,7 +799,7 @@ def create_app():
         predictionDate: str
 
     @app.post("/api/user-predictions/test/predict")
-    def api_user_predictions_test_predict(req: UserPredictionRequest):
+    async def api_user_predictions_test_predict(req: UserPredictionRequest):
         commodity = req.commodity.strip()
         if not commodity:
             raise HTTPException(status_code=400, detail="commodity is required")
@@ -321,7 +808,7 @@ def create_app():
         except ValueError:
             target = datetime.now() + timedelta(days=30)
         days_ahead = max(1, min(365, (target - datetime.now()).days))  # allow up to 1 year
-        result = predict(commodity, days_ahead)
+        result = await predict_batched(commodity, days_ahead, batcher, req.state, req.district)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         preds = result.get("predictions", [])
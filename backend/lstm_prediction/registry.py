@@ -0,0 +1,268 @@
+"""
+In-process model registry for the prediction API.
+Loads each commodity's <Commodity>.pt + <Commodity>_scaler.json once and keeps them in memory
+(LRU, capped at LSTM_MODEL_CACHE_SIZE). A model is reloaded when its files change on disk.
+Commodities without their own model (or all of them with LSTM_PREFER_GLOBAL=1) are served by the shared
+_global.pt from train_lstm.py --global: one set of weights, loaded once, selected per row by commodity id.
+A model's TorchScript artifact (<Commodity>_jit.pt from train_lstm.py) is served instead of the eager
+model when present and not older than the .pt (LSTM_USE_JIT=0 turns this off). With LSTM_USE_INT8=1 the dynamic
+int8 variant (<Commodity>_int8.pt) is served instead, but only for models whose accuracy report (_int8.json,
+written by train_lstm.py / evaluate_models.py) shows a MAPE increase of at most LSTM_INT8_MAX_MAPE_DELTA points.
+Regional models (train_lstm.py --regional) live under regional/<Commodity>/<State>[/<District>] and are
+cached the same way, keyed "<Commodity>/<State>[/<District>]"; only the ones requested are ever loaded.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT / "scripts") not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+MAX_MODELS = int(os.environ.get("LSTM_MODEL_CACHE_SIZE", "32"))  # 0 = unbounded
+PREFER_GLOBAL = os.environ.get("LSTM_PREFER_GLOBAL", "0") == "1"  # use _global.pt even if <Commodity>.pt exists
+USE_JIT = os.environ.get("LSTM_USE_JIT", "1") == "1"  # serve <Commodity>_jit.pt when it is up to date
+USE_INT8 = os.environ.get("LSTM_USE_INT8", "0") == "1"  # opt-in: serve <Commodity>_int8.pt when accurate enough
+INT8_MAX_MAPE_DELTA = float(os.environ.get("LSTM_INT8_MAX_MAPE_DELTA", "0.5"))  # percentage points vs fp32
+GLOBAL_NAME = "_global"
+
+from model_paths import model_files, variant_file  # noqa: E402  (scripts/ is on sys.path from here on)
+
+
+@dataclass
+class LoadedModel:
+    commodity: str
+    model: object  # lstm_model.LSTMModel in eval mode, or its TorchScript artifact
+    min_val: float
+    max_val: float
+    signature: tuple  # (model mtime_ns, scaler mtime_ns) at load time
+    load_ms: float
+    horizon: int = 1  # >1: direct multi-horizon model (predicts `horizon` days per forward pass)
+    commodity_id: Optional[int] = None  # set for the global model: embedding row of this commodity
+    digest: str = ""  # content hash of the model + scaler files (cache keys survive restarts and copies)
+    artifact: str = "eager"  # "jit": TorchScript artifact, "int8": dynamic int8 variant
+
+
+def _digest(*paths: Path) -> str:
+    h = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _signature(model_path: Path, scaler_path: Path) -> Optional[tuple]:
+    try:
+        return (model_path.stat().st_mtime_ns, scaler_path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+
+class ModelRegistry:
+    """Thread-safe LRU cache of loaded models, keyed by commodity name."""
+
+    def __init__(self, models_dir: Path, max_models: int = MAX_MODELS, prefer_global: bool = PREFER_GLOBAL,
+                 use_jit: bool = USE_JIT, use_int8: bool = USE_INT8, int8_max_mape_delta: float = INT8_MAX_MAPE_DELTA):
+        self.models_dir = Path(models_dir)
+        self.max_models = max_models
+        self.prefer_global = prefer_global
+        self.use_jit = use_jit
+        self.use_int8 = use_int8
+        self.int8_max_mape_delta = int8_max_mape_delta
+        self._int8_reports: dict = {}  # report path -> (mtime_ns, accepted)
+        self._global: Optional[tuple] = None  # (signature, meta, shared model or None until first use, digest)
+        self._global_lock = threading.Lock()
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict = {}  # key -> [lock, requests using it]; dropped when the last one is done
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.load_time_ms = 0.0
+
+    def paths(self, commodity: str, state: str = "", district: str = ""):
+        return model_files(self.models_dir, commodity, state, district)
+
+    def global_paths(self):
+        return self.models_dir / f"{GLOBAL_NAME}.pt", self.models_dir / f"{GLOBAL_NAME}_meta.json"
+
+    def _global_state(self) -> Optional[tuple]:
+        """(signature, meta, model) of the global model, re-reading meta when the files change. None if absent."""
+        sig = _signature(*self.global_paths())
+        if sig is None:
+            return None
+        with self._global_lock:
+            if self._global is None or self._global[0] != sig:
+                with open(self.global_paths()[1]) as f:
+                    self._global = (sig, json.load(f), None, "")
+            return self._global
+
+    def global_commodities(self) -> list:
+        """Commodities the global model was trained on ([] without _global.pt)."""
+        state = self._global_state()
+        return list(state[1]["commodities"]) if state else []
+
+    def _int8_accepted(self, report_path: Path, mtime: int) -> bool:
+        """True if the int8 report's MAPE delta is within int8_max_mape_delta. Re-read only when the report changes."""
+        with self._lock:
+            cached = self._int8_reports.get(report_path)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(report_path) as f:
+                    accepted = float(json.load(f)["delta"]["MAPE"]) <= self.int8_max_mape_delta
+            except (OSError, ValueError, KeyError, TypeError):
+                accepted = False
+            cached = (mtime, accepted)
+            with self._lock:
+                self._int8_reports[report_path] = cached
+        return cached[1]
+
+    def _variant(self, model_path: Path, model_mtime: int) -> Optional[tuple]:
+        """(variant, mtime_ns, ...) of the serving variant of model_path to load instead of the eager model, or None.
+        int8 (if enabled and accepted by its report) before jit; either must not be older than the .pt."""
+        if self.use_int8:
+            int8_path = variant_file(model_path, "int8")
+            sig = _signature(int8_path, int8_path.with_suffix(".json"))
+            if sig is not None and min(sig) >= model_mtime and self._int8_accepted(int8_path.with_suffix(".json"), sig[1]):
+                return ("int8", *sig)
+        if self.use_jit:
+            try:
+                mtime = variant_file(model_path, "jit").stat().st_mtime_ns
+            except FileNotFoundError:
+                return None
+            if mtime >= model_mtime:
+                return ("jit", mtime)
+        return None
+
+    def resolve(self, commodity: str, state: str = "", district: str = ""):
+        """(model path, scaler/meta path, signature) serving commodity (in state/district), or None if it has
+        no model at exactly that level. Global-model signatures start with GLOBAL_NAME; per-commodity ones
+        end with the serving variant to load (see _variant; None: eager model)."""
+        model_path, scaler_path = self.paths(commodity, state, district)
+        sig = _signature(model_path, scaler_path)
+        if not state and (sig is None or self.prefer_global):
+            glob = self._global_state()
+            if glob is not None and commodity in glob[1]["commodities"]:
+                return (*self.global_paths(), (GLOBAL_NAME, *glob[0]))
+        if sig is None:
+            return None
+        return model_path, scaler_path, (*sig, self._variant(model_path, sig[0]))
+
+    def get(self, commodity: str, state: str = "", district: str = "") -> Optional[LoadedModel]:
+        """Return the loaded model for commodity (or its state/district model), loading it on first use.
+        None if not trained at that level."""
+        key = "/".join(p for p in (commodity, state, district) if p)
+        resolved = self.resolve(commodity, state, district)
+        model_path, scaler_path, sig = resolved if resolved else (None, None, None)
+        if sig is None:
+            self.evict(key)
+            return None
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None and entry.signature == sig:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return entry
+            load_lock = self._load_locks.setdefault(key, [threading.Lock(), 0])
+            load_lock[1] += 1
+        # Load outside the registry lock so other commodities are served meanwhile;
+        # the per-key lock stops concurrent requests loading the same file twice.
+        try:
+            with load_lock[0]:
+                with self._lock:
+                    current = self._models.get(key)
+                    if current is not None and current.signature == sig:
+                        self._models.move_to_end(key)
+                        self.hits += 1
+                        return current
+                fresh = self._load(commodity, model_path, scaler_path, sig)
+                with self._lock:
+                    self.misses += 1
+                    if entry is not None:
+                        self.reloads += 1
+                    self.load_time_ms += fresh.load_ms
+                    self._models[key] = fresh
+                    self._models.move_to_end(key)
+                    while self.max_models > 0 and len(self._models) > self.max_models:
+                        self._models.popitem(last=False)
+                        self.evictions += 1
+                return fresh
+        finally:
+            with self._lock:
+                load_lock[1] -= 1
+                if load_lock[1] == 0:
+                    del self._load_locks[key]
+
+    def _load(self, commodity: str, model_path: Path, scaler_path: Path, sig: tuple) -> LoadedModel:
+        import torch
+        from lstm_model import GlobalLSTMModel, LSTMModel
+
+        t0 = time.perf_counter()
+        if sig[0] == GLOBAL_NAME:
+            # One shared GlobalLSTMModel; each commodity gets a LoadedModel view with its id and scaler
+            with self._global_lock:
+                gsig, meta, model, digest = self._global
+                if model is None:
+                    model = GlobalLSTMModel(
+                        len(meta["commodities"]), embed_dim=int(meta["embed_dim"]), horizon=int(meta["horizon"])
+                    )
+                    model.load_state_dict(torch.load(model_path, map_location=torch.device("cpu")))
+                    model.eval()
+                    digest = _digest(model_path, scaler_path)
+                    self._global = (gsig, meta, model, digest)
+            info = meta["commodities"][commodity]
+            load_ms = (time.perf_counter() - t0) * 1000
+            return LoadedModel(commodity, model, float(info["min"]), float(info["max"]), sig, load_ms,
+                               int(meta["horizon"]), int(info["id"]), digest)
+        with open(scaler_path) as f:
+            scaler = json.load(f)
+        horizon = int(scaler.get("horizon", 1))  # older scalers have no horizon: next-day model
+        if sig[-1] is not None:
+            from lstm_model import load_torchscript
+
+            artifact = sig[-1][0]
+            path = variant_file(model_path, artifact)
+            model, digest = load_torchscript(path), _digest(model_path, scaler_path, path)
+        else:
+            model = LSTMModel(horizon=horizon)
+            model.load_state_dict(torch.load(model_path, map_location=torch.device("cpu")))
+            model.eval()
+            artifact, digest = "eager", _digest(model_path, scaler_path)
+        load_ms = (time.perf_counter() - t0) * 1000
+        return LoadedModel(commodity, model, float(scaler["min"]), float(scaler["max"]), sig, load_ms, horizon,
+                           digest=digest, artifact=artifact)
+
+    def evict(self, key: str) -> None:
+        with self._lock:
+            if self._models.pop(key, None) is not None:
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._models),
+                "capacity": self.max_models,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "loadTimeMsTotal": round(self.load_time_ms, 2),
+                "loadTimeMsAvg": round(self.load_time_ms / self.misses, 2) if self.misses else 0.0,
+                "jitModels": sum(1 for m in self._models.values() if m.artifact == "jit"),
+                "int8Models": sum(1 for m in self._models.values() if m.artifact == "int8"),
+                "models": list(self._models.keys()),
+                "globalModel": self._global is not None and self._global[2] is not None,
+            }
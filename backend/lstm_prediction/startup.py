@@ -0,0 +1,82 @@
+"""
+Startup and metadata for the prediction API.
+Cached holds a value (the popular commodity list, the trained-model index) built once and rebuilt only when
+its signature changes, e.g. the mtime of the models directory; checking it costs a stat() per request.
+Warmup runs the expensive first-use work (import torch, load hot models, first forward pass) in a
+background thread at startup, so the server accepts requests at once; /healthz/ready reports when it is done.
+"""
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def mtime_signature(*paths: Path) -> tuple:
+    """mtime_ns of each path (None if missing). A directory's mtime changes when entries are added, removed or
+    renamed (train_lstm.py writing a new model), not when a file in it is rewritten in place."""
+    sig = []
+    for path in paths:
+        try:
+            sig.append(path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+class Cached:
+    """Thread-safe value from load(), rebuilt when signature() returns something new."""
+
+    def __init__(self, load: Callable, signature: Callable[[], tuple]):
+        self.load = load
+        self.signature = signature
+        self._lock = threading.Lock()
+        self._sig: Optional[tuple] = None
+        self._value = None
+        self.builds = 0
+
+    def get(self):
+        sig = self.signature()
+        with self._lock:
+            if self.builds == 0 or sig != self._sig:
+                self._value = self.load()
+                self._sig = sig
+                self.builds += 1
+            return self._value
+
+
+class Warmup:
+    """Runs steps() once in a daemon thread. steps() returns a dict of details for /healthz/ready."""
+
+    def __init__(self, steps: Callable[[], dict]):
+        self.steps = steps
+        self._thread: Optional[threading.Thread] = None
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.seconds: Optional[float] = None
+        self.details: dict = {}
+        self.error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        self.started_at = time.time()
+        t0 = time.perf_counter()
+        try:
+            self.details = self.steps() or {}
+        except Exception:
+            # Not fatal: requests still work, they just pay the first-use cost themselves
+            self.error = traceback.format_exc(limit=3)
+        self.seconds = round(time.perf_counter() - t0, 3)
+        self.ready = True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmupSeconds": self.seconds,
+            "error": self.error,
+            **self.details,
+        }
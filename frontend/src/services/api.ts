@@ -88,6 +88,9 @@ export const predictionsAPI = {
     api.post('/predictions/generate', data),
   batchGenerate: (data: any) => 
     api.post('/predictions/batch-generate', data),
+  // Many crops in one call: per-item { success, predictions } or { success: false, error }
+  batchPredict: (items: { commodity: string; days: number }[]) => 
+    api.post('/predictions/batch', { items }),
   trainModel: (data: any) => 
     api.post('/predictions/train', data),
   getAccuracy: (params?: any) => 
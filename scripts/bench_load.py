@@ -0,0 +1,84 @@
+"""
+Benchmark load_data_into_db.py: streaming loader vs --fast bulk loader on a synthetic crop_prices.csv.
+Everything is written to a temporary directory; data/ is not touched.
+Run from project root: python scripts/bench_load.py            (10M rows)
+                       python scripts/bench_load.py --rows 1000000 --workers 4
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+from load_data_into_db import full_load
+from popular_commodities import POPULAR_COMMODITIES
+
+STATES = {
+    "Karnataka": ["Bangalore", "Mysore", "Belgaum", "Hubli"],
+    "Maharashtra": ["Pune", "Nashik", "Nagpur", "Solapur"],
+    "Uttar Pradesh": ["Agra", "Lucknow", "Kanpur", "Varanasi"],
+    "Gujarat": ["Ahmedabad", "Rajkot", "Surat"],
+}
+
+
+def write_synthetic_csv(path: Path, rows: int) -> None:
+    rng = random.Random(0)
+    regions = [(s, d) for s, ds in STATES.items() for d in ds]
+    start = date(2020, 1, 1)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("date,commodity,state,district,modal_price,min_price,max_price\r\n")
+        for i in range(rows):
+            d = (start + timedelta(days=(i // 2000) % 2200)).isoformat()
+            state, district = regions[i % len(regions)]
+            commodity = POPULAR_COMMODITIES[(i * 7) % len(POPULAR_COMMODITIES)]
+            modal = rng.randint(500, 12000)
+            f.write(f"{d},{commodity},{state},{district},{modal},{modal * 9 // 10},{modal * 11 // 10}\r\n")
+
+
+def run(csv_path: Path, db_path: Path, workers: int) -> float:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    t0 = time.perf_counter()
+    full_load(conn, csv_path, workers=workers)
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crop_prices loaders on synthetic data.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--skip-baseline", action="store_true", help="Only time the --fast loader")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        csv_path = tmp / "crop_prices.csv"
+        print(f"Writing {args.rows:,} synthetic rows ...")
+        t0 = time.perf_counter()
+        write_synthetic_csv(csv_path, args.rows)
+        print(f"  {csv_path.stat().st_size / 1e6:,.0f} MB in {time.perf_counter() - t0:.1f}s")
+
+        results = {}
+        if not args.skip_baseline:
+            print("\n--- streaming loader ---")
+            results["streaming"] = run(csv_path, tmp / "streaming.db", workers=0)
+        print(f"\n--- fast loader ({args.workers} workers) ---")
+        results["fast"] = run(csv_path, tmp / "fast.db", workers=args.workers)
+
+    print("\n--- Summary (total time incl. indexes + rollup) ---")
+    for name, elapsed in results.items():
+        print(f"  {name:10s} {elapsed:8.1f}s  {args.rows / elapsed:12,.0f} rows/s")
+    if len(results) == 2:
+        print(f"  speedup    {results['streaming'] / results['fast']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Read the Parquet copy of crop prices written by merge_all_crops.py --parquet.
+Partitioned by year and canonical commodity (hive layout), so a filter on commodity/year only opens
+that commodity's files, and only the requested columns are decoded. Used by train_lstm.py and the API
+when crop_prices.db is not available.
+The dataset's file list is discovered once per version (the mtime of the _version marker that
+merge_all_crops.py writes last), not on every read.
+"""
+import threading
+from datetime import date
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from popular_commodities import canonical_commodity
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PARQUET_DIR = PROJECT_ROOT / "data" / "crop_prices_parquet"
+VERSION_FILE = "_version"  # hive discovery skips files starting with "_"
+
+_lock = threading.Lock()
+_datasets = {}  # dataset dir -> (version, pyarrow Dataset)
+_scanned = {}  # dataset dir -> newest file mtime, for copies written before the marker existed
+
+
+def available(dataset_dir: Path = PARQUET_DIR) -> bool:
+    if not dataset_dir.exists():
+        return False
+    try:
+        import pyarrow.dataset  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def version(dataset_dir: Path = PARQUET_DIR) -> int:
+    """Changes whenever merge_all_crops.py --parquet rewrites the copy: mtime_ns of its _version marker
+    (one stat). Without a marker, the newest file's mtime_ns, scanned once per process."""
+    try:
+        return (dataset_dir / VERSION_FILE).stat().st_mtime_ns
+    except FileNotFoundError:
+        pass
+    key = str(dataset_dir)
+    with _lock:
+        if key not in _scanned:
+            _scanned[key] = max((p.stat().st_mtime_ns for p in dataset_dir.rglob("*.parquet")), default=0)
+        return _scanned[key]
+
+
+def _dataset(dataset_dir: Path):
+    import pyarrow.dataset as ds
+
+    key, current = str(dataset_dir), version(dataset_dir)
+    with _lock:
+        cached = _datasets.get(key)
+        if cached is None or cached[0] != current:
+            cached = _datasets[key] = (current, ds.dataset(dataset_dir, format="parquet", partitioning="hive"))
+        return cached[1]
+
+
+def daily_prices(
+    commodity: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    dataset_dir: Path = PARQUET_DIR,
+) -> List[Tuple[str, float, float, float]]:
+    """[(date 'YYYY-MM-DD', avg modal, avg min, avg max)] per day for a commodity (an archive alias such as
+    "Soyabean" reads its canonical partition), sorted by date.
+    start/end are inclusive ISO dates; state/district filter markets like the API's graph query."""
+    import pyarrow.dataset as ds
+
+    dataset = _dataset(dataset_dir)
+    expr = (ds.field("commodity") == canonical_commodity(commodity)) & (ds.field("modal_price") > 0)
+    if start:
+        expr &= (ds.field("year") >= int(start[:4])) & (ds.field("date") >= date.fromisoformat(start[:10]))
+    if end:
+        expr &= (ds.field("year") <= int(end[:4])) & (ds.field("date") <= date.fromisoformat(end[:10]))
+    if state:
+        expr &= ds.field("state") == state
+    if district:
+        expr &= ds.field("district") == district
+    table = dataset.to_table(columns=["date", "modal_price", "min_price", "max_price"], filter=expr)
+    if table.num_rows == 0:
+        return []
+    daily = table.group_by("date").aggregate(
+        [("modal_price", "mean"), ("min_price", "mean"), ("max_price", "mean")]
+    ).sort_by("date")
+    return [
+        (d.isoformat(), float(m), float(lo) if lo is not None else 0.0, float(hi) if hi is not None else 0.0)
+        for d, m, lo, hi in zip(
+            daily.column("date").to_pylist(),
+            daily.column("modal_price_mean").to_pylist(),
+            daily.column("min_price_mean").to_pylist(),
+            daily.column("max_price_mean").to_pylist(),
+        )
+    ]
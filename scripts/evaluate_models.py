@@ -3,7 +3,19 @@ Evaluate trained LSTM models: compute RMSE, MAE, MAPE on validation set.
 Run from project root: python scripts/evaluate_models.py
 
 Outputs: metrics per commodity and aggregate summary to data/models/evaluation_results.json
+
+Quantize every trained model to dynamic int8 (<Commodity>_int8.pt) before evaluating:
+    python scripts/evaluate_models.py --quantize
+Whenever an _int8.pt exists, its metrics and the int8 - fp32 deltas are reported as well and written to
+<Commodity>_int8.json, which the API checks before serving it (LSTM_USE_INT8=1).
+
+Check that each TorchScript serving artifact (<Commodity>_jit.pt) matches its eager model on the
+commodity's own last window (forward + 30-day rollout) and on random windows:
+    python scripts/evaluate_models.py --check-jit
+--check-jit is a manual check, not an automated test: it needs trained models and price data, and exits 1 if
+nothing was compared. The untrained-model rollout and export checks live in tests/.
 """
+import argparse
 import json
 import sqlite3
 import sys
@@ -18,10 +30,13 @@ MODELS_DIR = PROJECT_ROOT / "data" / "models"
 START_YEAR = 2020
 END_YEAR = 2026
 LOOKBACK = 60
+ROLLOUT_CHECK_DAYS = 30
 
 sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
 from popular_commodities import POPULAR_COMMODITIES
-from train_lstm import load_series, build_sequences
+from model_paths import model_files, variant_file
+from train_lstm import forecast_metrics, load_series, predict_windows, write_int8_report
+from window_dataset import WindowDataset
 
 
 def evaluate_one(commodity: str) -> dict | None:
@@ -48,48 +63,145 @@ def evaluate_one(commodity: str) -> dict | None:
         scaler = json.load(f)
     min_val = scaler["min"]
     max_val = scaler["max"]
+    horizon = int(scaler.get("horizon", 1))
 
     scaled = (values - min_val) / (max_val - min_val) if max_val > min_val else values * 0
-    X, y = build_sequences(scaled, LOOKBACK)
-    n = len(X)
-    train_n = int(0.85 * n)
-    X_val, y_val = X[train_n:], y[train_n:]
-
-    if len(X_val) == 0:
+    ds = WindowDataset([scaled], LOOKBACK, horizon)
+    _, val_idx = ds.split(0.85)
+    if len(val_idx) == 0:
         return None
+    y_val = ds.batch(val_idx)[1]
 
     from lstm_model import LSTMModel
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = LSTMModel().to(device)
+    model = LSTMModel(horizon=horizon).to(device)
     model.load_state_dict(torch.load(model_path, map_location=device))
     model.eval()
 
-    Xv = torch.from_numpy(X_val).to(device)
-    with torch.no_grad():
-        val_pred_scaled = model(Xv).cpu().numpy()
+    val_pred_scaled = predict_windows(model, ds, val_idx, device)
+    if horizon > 1:  # direct model: score the next-day column, comparable with next-day models
+        val_pred_scaled, y_val = val_pred_scaled[:, 0], y_val[:, 0]
+    fp32 = forecast_metrics(val_pred_scaled, y_val, min_val, max_val)
+    result = {k: round(v, 4) for k, v in fp32.items()}
+    result["n_val"] = len(y_val)
 
-    val_pred_orig = val_pred_scaled * (max_val - min_val) + min_val
-    val_orig = y_val * (max_val - min_val) + min_val
+    int8_path = variant_file(model_path, "int8")
+    if int8_path.exists():
+        from lstm_model import load_torchscript
 
-    rmse = np.sqrt(np.mean((val_orig - val_pred_orig) ** 2))
-    mae = np.mean(np.abs(val_orig - val_pred_orig))
-    mape = np.mean(np.abs((val_orig - val_pred_orig) / (np.abs(val_orig) + 1e-8))) * 100
+        int8_pred = predict_windows(load_torchscript(int8_path), ds, val_idx, torch.device("cpu"))
+        if horizon > 1:
+            int8_pred = int8_pred[:, 0]
+        report = write_int8_report(model_path, fp32, forecast_metrics(int8_pred, y_val, min_val, max_val))
+        result["int8"] = {k: round(v, 4) for k, v in report["int8"].items()}
+        result["int8"]["delta"] = {k: round(v, 4) for k, v in report["delta"].items()}
+    return result
 
-    return {
-        "RMSE": round(float(rmse), 4),
-        "MAE": round(float(mae), 4),
-        "MAPE": round(float(mape), 4),
-        "n_val": len(val_orig),
-    }
+
+def quantize_all() -> int:
+    """Write <Commodity>_int8.pt for every popular commodity with a trained model. Returns how many."""
+    import torch
+    from lstm_model import LSTMModel, quantize_int8, save_torchscript
+
+    n = 0
+    for commodity in POPULAR_COMMODITIES:
+        model_path, scaler_path = model_files(MODELS_DIR, commodity)
+        if not model_path.exists() or not scaler_path.exists():
+            continue
+        with open(scaler_path) as f:
+            horizon = int(json.load(f).get("horizon", 1))
+        model = LSTMModel(horizon=horizon)
+        model.load_state_dict(torch.load(model_path, map_location="cpu"))
+        save_torchscript(quantize_int8(model), variant_file(model_path, "int8"))
+        n += 1
+    return n
+
+
+def check_jit(commodity: str, days: int = ROLLOUT_CHECK_DAYS) -> dict | None:
+    """Max |eager - TorchScript| in price units for commodity's forecast from its last window, plus the
+    scaled-unit parity error on random windows. None if there is no model or no artifact; {"stale": True}
+    without comparing if the artifact is older than the .pt (the API does not serve it)."""
+    import torch
+    from lstm_model import LSTMModel, load_torchscript, parity_error
+
+    model_path, scaler_path = model_files(MODELS_DIR, commodity)
+    jit_path = variant_file(model_path, "jit")
+    if not (model_path.exists() and scaler_path.exists() and jit_path.exists()):
+        return None
+    if jit_path.stat().st_mtime_ns < model_path.stat().st_mtime_ns:
+        return {"stale": True}
+    with open(scaler_path) as f:
+        scaler = json.load(f)
+    horizon = int(scaler.get("horizon", 1))
+    eager = LSTMModel(horizon=horizon)
+    eager.load_state_dict(torch.load(model_path, map_location="cpu"))
+    eager.eval()
+    exported = load_torchscript(jit_path)
+    result = {"random_max_diff": parity_error(eager, exported, LOOKBACK), "stale": False}
+    series = load_series(commodity)
+    if len(series) >= LOOKBACK:
+        min_val, max_val = scaler["min"], scaler["max"]
+        span = max_val - min_val if max_val > min_val else 1.0
+        x = torch.from_numpy(((series.values[-LOOKBACK:] - min_val) / span).astype(np.float32)).reshape(1, LOOKBACK, 1)
+        with torch.no_grad():
+            diff = (eager(x) - exported(x)).abs().max().item()
+            if horizon == 1:
+                a, sa = eager.step(x)
+                b, sb = exported.step(x)
+                for _ in range(days - 1):
+                    a, sa = eager.step(a.reshape(1, 1, 1), state=sa)
+                    b, sb = exported.step(b.reshape(1, 1, 1), state=sb)
+                    diff = max(diff, (a - b).abs().max().item())
+        result["price_max_diff"] = diff * span
+    return result
+
+
+def main_check_jit():
+    from lstm_model import JIT_PARITY_ATOL
+
+    failed = checked = stale = 0
+    for commodity in POPULAR_COMMODITIES:
+        r = check_jit(commodity)
+        if r is None:
+            continue
+        if r["stale"]:
+            stale += 1
+            print(f"  {commodity}: skipped, artifact older than the .pt (not served)")
+            continue
+        checked += 1
+        ok = r["random_max_diff"] <= JIT_PARITY_ATOL
+        failed += not ok
+        price = f", {r['price_max_diff']:.6f} in price" if "price_max_diff" in r else ""
+        print(f"  {commodity}: max diff {r['random_max_diff']:.2e} scaled{price} {'ok' if ok else 'FAIL'}")
+    if not checked:
+        print(f"0 TorchScript artifacts checked ({stale} stale): needs trained models with an up-to-date "
+              "<Commodity>_jit.pt. Run train_lstm.py first.")
+        sys.exit(1)
+    if failed:
+        print(f"{failed} of {checked} TorchScript artifacts differ from their eager model by more than {JIT_PARITY_ATOL}.")
+        sys.exit(1)
+    print(f"{checked} TorchScript artifacts match their eager models within {JIT_PARITY_ATOL}.")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Evaluate trained LSTM models.")
+    parser.add_argument("--quantize", action="store_true",
+                        help="First write a dynamic int8 variant (<Commodity>_int8.pt) of every trained model")
+    parser.add_argument("--check-jit", action="store_true",
+                        help="Compare each TorchScript artifact (<Commodity>_jit.pt) with its eager model instead of evaluating")
+    args = parser.parse_args()
+    if args.check_jit:
+        main_check_jit()
+        return
+
     if not DB_PATH.exists() and not CSV_PATH.exists():
         print("No crop_prices.db or data/crop_prices.csv. Run data pipeline first.")
         sys.exit(1)
     if not MODELS_DIR.exists():
         print("No models directory. Run train_lstm.py first.")
         sys.exit(1)
+    if args.quantize:
+        print(f"Quantized {quantize_all()} models to int8.")
 
     results = {}
     for commodity in POPULAR_COMMODITIES:
@@ -97,6 +209,9 @@ def main():
         if m:
             results[commodity] = m
             print(f"  {commodity}: RMSE={m['RMSE']:.2f}  MAE={m['MAE']:.2f}  MAPE={m['MAPE']:.2f}%")
+            if "int8" in m:
+                d = m["int8"]["delta"]
+                print(f"  {' ' * len(commodity)}  int8 vs fp32: RMSE {d['RMSE']:+.2f}  MAE {d['MAE']:+.2f}  MAPE {d['MAPE']:+.3f} pts")
         else:
             print(f"  {commodity}: skip (no model or insufficient data)")
 
@@ -2,19 +2,146 @@
 Export crop prices to frontend/public/crop_prices.json so the app can show graphs.
 Run after load_data_into_db.py. Reads from crop_prices.db (or data/crop_prices.csv if no DB).
 Streams row-by-row so it does NOT load everything into memory (avoids laptop hang).
+
+Sharded mode writes the daily rollup instead of raw rows, one small file per commodity (and per state
+with --by-state), so the frontend fetches only the crop it shows:
+    python scripts/export_for_frontend.py --shards [--by-state] [--compress gzip br]
+    → frontend/public/prices/manifest.json, Onion.json(.gz/.br), Onion/Karnataka.json(.gz/.br), ...
+Without --compress, .gz copies are always written and .br copies when the brotli package is installed.
+Each shard is columnar: {"commodity", "state", "dates": [...], "modal": [...], "min": [...], "max": [...],
+"records": [...]} with the arrays aligned by index. manifest.json lists every shard with its sizes and date range.
 """
+import argparse
 import csv
+import gzip
 import json
+import shutil
 import sqlite3
+import sys
+from datetime import datetime
+from itertools import groupby
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "crop_prices.db"
 CSV_PATH = PROJECT_ROOT / "data" / "crop_prices.csv"
 OUT_PATH = PROJECT_ROOT / "frontend" / "public" / "crop_prices.json"
+SHARDS_DIR = PROJECT_ROOT / "frontend" / "public" / "prices"
+
+
+def _safe_name(name: str) -> str:
+    return name.strip().replace(" ", "_").replace("/", "_")
+
+
+def _compressor(codec: str):
+    """bytes -> bytes for a --compress codec. Output is deterministic (no timestamps), so unchanged shards keep their bytes."""
+    if codec == "gzip":
+        return lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        print("Install brotli for --compress br: pip install brotli", file=sys.stderr)
+        sys.exit(1)
+    return lambda data: brotli.compress(data, quality=11)
+
+
+def _default_codecs() -> list:
+    """gzip, plus br when brotli is installed."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        print("brotli not installed: writing .gz copies only (pip install brotli for .br)")
+        return ["gzip"]
+    return ["gzip", "br"]
+
+
+def _write_shard(out_dir: Path, rel: str, doc: dict, compressors: dict) -> dict:
+    """Write doc as compact JSON at out_dir/rel plus one compressed copy per codec. Returns its manifest entry."""
+    data = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    path = out_dir / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    entry = {"file": rel, "bytes": len(data)}
+    for codec, compress in compressors.items():
+        packed = compress(data)
+        path.with_name(path.name + (".gz" if codec == "gzip" else ".br")).write_bytes(packed)
+        entry[f"{codec}Bytes"] = len(packed)
+    entry.update(days=len(doc["dates"]), start=doc["dates"][0], end=doc["dates"][-1])
+    return entry
+
+
+def export_shards(out_dir: Path = SHARDS_DIR, by_state: bool = False, codecs=("gzip",)) -> dict:
+    """Write per-commodity (and per-state) shards of daily_commodity_prices plus manifest.json into out_dir.
+    Rows are streamed in (commodity, state, date) order, so one series is in memory at a time. The new
+    export is built next to out_dir and swapped in at the end. Returns the manifest."""
+    compressors = {codec: _compressor(codec) for codec in codecs}
+    conn = sqlite3.connect(DB_PATH)
+    data_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    cur = conn.execute(
+        f"""
+        SELECT commodity, state, date, modal_price, min_price, max_price, n_records
+        FROM daily_commodity_prices
+        WHERE district = ''{"" if by_state else " AND state = ''"}
+        ORDER BY commodity, state, date
+        """
+    )
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    commodities = {}
+    shards = 0
+    for (commodity, state), rows in groupby(cur, key=lambda r: (r[0], r[1])):
+        rows = list(rows)
+        doc = {
+            "commodity": commodity,
+            "state": state,
+            "dates": [r[2] for r in rows],
+            "modal": [round(r[3], 2) for r in rows],
+            "min": [None if r[4] is None else round(r[4], 2) for r in rows],
+            "max": [None if r[5] is None else round(r[5], 2) for r in rows],
+            "records": [r[6] for r in rows],
+        }
+        info = commodities.setdefault(commodity, {})
+        if state:
+            rel = f"{_safe_name(commodity)}/{_safe_name(state)}.json"
+            info.setdefault("states", {})[state] = _write_shard(tmp_dir, rel, doc, compressors)
+        else:
+            info.update(_write_shard(tmp_dir, f"{_safe_name(commodity)}.json", doc, compressors))
+        shards += 1
+        if shards % 500 == 0:
+            print(f"  Exported {shards} shards ...")
+    conn.close()
+    manifest = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "dataVersion": data_version,
+        "columns": ["dates", "modal", "min", "max", "records"],
+        "encodings": list(compressors),
+        "commodities": commodities,
+    }
+    with open(tmp_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp_dir.rename(out_dir)
+    print(f"Exported {shards} shards for {len(commodities)} commodities to {out_dir}")
+    return manifest
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Export crop prices for the frontend.")
+    parser.add_argument("--shards", action="store_true",
+                        help=f"Write per-commodity daily series shards + manifest to {SHARDS_DIR} instead of crop_prices.json")
+    parser.add_argument("--by-state", action="store_true", help="With --shards, also write one shard per commodity and state")
+    parser.add_argument("--compress", nargs="*", choices=["gzip", "br"], default=None,
+                        help="Compressed copies written next to each shard (default: gzip, and br if brotli is installed)")
+    args = parser.parse_args()
+    if args.shards:
+        if not DB_PATH.exists():
+            print("--shards reads the daily rollup in crop_prices.db. Run load_data_into_db.py first.", file=sys.stderr)
+            sys.exit(1)
+        codecs = _default_codecs() if args.compress is None else list(dict.fromkeys(args.compress))
+        export_shards(SHARDS_DIR, args.by_state, codecs)
+        return
+
     OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     if DB_PATH.exists():
@@ -1,7 +1,33 @@
 """Load data/crop_prices.csv into crop_prices.db. Run after merge_all_crops.py.
-Streams in chunks so it does NOT load the whole CSV into memory (avoids laptop hang)."""
+Streams in chunks so it does NOT load the whole CSV into memory (avoids laptop hang).
+Dates are stored as ISO YYYY-MM-DD and commodity names are resolved to ids in the `commodities`
+table (alias -> canonical name, see popular_commodities.COMMODITY_ALIASES). Indexes are built
+after the rows are in, then the daily_commodity_prices rollup (what the API and training read).
+
+Incremental mode (nightly updates) reads the archive year CSVs directly and only the bytes not yet
+loaded, tracked per file in the ingest_manifest table (a file whose loaded bytes changed, e.g. re-downloaded,
+is re-read from the start). New rows are upserted on their natural key
+(date, commodity, state, district, market, variety, grade) and only the touched rollup days are rebuilt:
+    python scripts/load_data_into_db.py --incremental
+
+Fast bulk mode (full reload) parses byte ranges of crop_prices.csv in worker processes and feeds a
+single writer with journaling and fsync off; indexes are built once the data is in:
+    python scripts/load_data_into_db.py --fast [--workers N]
+Benchmark: python scripts/bench_load.py
+"""
+import argparse
 import csv
+import hashlib
+import io
+import math
+import multiprocessing
+import os
 import sqlite3
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -10,72 +36,525 @@ CSV_PATH = DATA_DIR / "crop_prices.csv"
 DB_PATH = DATA_DIR / "crop_prices.db"
 
 CHUNK_SIZE = 50_000  # rows per batch – low memory, progress visible
+READ_BLOCK = 16 * 1024 * 1024  # bytes read per step in incremental mode
+FAST_RANGE_BYTES = 32 * 1024 * 1024  # CSV byte range parsed per worker task in --fast mode
+
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+from popular_commodities import canonical_commodity
+from merge_all_crops import ARCHIVE_CSV_DIR, ARCHIVE_MAP, MIN_YEAR
+
+# Archive columns that, with date/commodity/state/district, identify one source row (incremental upserts)
+KEY_COLUMNS = {"Market": "market", "Variety": "variety", "Grade": "grade"}
+
+# Covering indexes for the API/training queries (per-commodity daily series, optionally per region)
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_crop_prices_commodity_date"
+    " ON crop_prices (commodity_id, date, modal_price, min_price, max_price)",
+    "CREATE INDEX IF NOT EXISTS idx_crop_prices_commodity_region"
+    " ON crop_prices (commodity_id, state, district, date)",
+    # Natural key of archive rows (incremental mode); merged-CSV rows have no market and are not keyed
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_crop_prices_natural"
+    " ON crop_prices (date, commodity_id, state, district, market, variety, grade) WHERE market <> ''",
+]
+NATURAL_KEY = "(date, commodity_id, state, district, market, variety, grade) WHERE market <> ''"
+NO_MARKET = "-"  # stored for archive rows with a blank Market, so they are keyed (and upserted) too
 
-def _to_float(s):
-    if not s or not str(s).strip().replace(".", "").replace("-", "").isdigit():
+
+def _parse_float(s: str):
+    """Price cell -> float, or None for blanks / non-numeric / NaN / inf. The one price parser of every load
+    mode (and of merge_all_crops.py --parquet), so they all store the same values."""
+    if not s:
         return None
     try:
-        return float(s)
+        v = float(s)
     except ValueError:
         return None
+    return v if math.isfinite(v) else None
 
-def main():
-    if not CSV_PATH.exists():
-        print("No crop_prices.csv found. Run download_from_kaggle.py then merge_all_crops.py first.")
-        return
-    print("load_data_into_db.py started (chunked – low memory).")
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+
+def to_iso_date(s: str) -> str:
+    """Normalize archive dates (YYYY-MM-DD[...], DD/MM/YYYY, DD-MM-YYYY) to YYYY-MM-DD so they sort and range-filter."""
+    s = s.strip()
+    if len(s) >= 10 and s[4] == "-" and s[7] == "-":
+        return s[:10]
+    if len(s) == 10 and s[2] in "/-" and s[5] == s[2]:
+        return f"{s[6:10]}-{s[3:5]}-{s[0:2]}"
+    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return s
+
+
+def create_schema(cur) -> None:
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS commodities (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            canonical TEXT NOT NULL
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_commodities_canonical ON commodities (canonical)")
     cur.execute("""
         CREATE TABLE IF NOT EXISTS crop_prices (
             date TEXT,
             commodity TEXT,
+            commodity_id INTEGER REFERENCES commodities (id),
             state TEXT,
             district TEXT,
+            market TEXT NOT NULL DEFAULT '',
+            variety TEXT NOT NULL DEFAULT '',
+            grade TEXT NOT NULL DEFAULT '',
             modal_price REAL,
             min_price REAL,
             max_price REAL
         )
     """)
-    cur.execute("DELETE FROM crop_prices")
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(crop_prices)").fetchall()}
+    if "commodity_id" not in columns:  # table created before commodity ids existed
+        cur.execute("ALTER TABLE crop_prices ADD COLUMN commodity_id INTEGER REFERENCES commodities (id)")
+        ids = commodity_ids(cur)
+        for (name,) in cur.execute("SELECT DISTINCT commodity FROM crop_prices").fetchall():
+            cur.execute("UPDATE crop_prices SET commodity_id = ? WHERE commodity IS ?", (commodity_id(cur, ids, name or ""), name))
+    for col in KEY_COLUMNS.values():
+        if col not in columns:  # table created before incremental mode existed
+            cur.execute(f"ALTER TABLE crop_prices ADD COLUMN {col} TEXT NOT NULL DEFAULT ''")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_manifest (
+            source TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            byte_offset INTEGER NOT NULL,
+            rows INTEGER NOT NULL,
+            loaded_at TEXT NOT NULL,
+            prefix_sha1 TEXT NOT NULL DEFAULT ''
+        )
+    """)
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(ingest_manifest)").fetchall()}
+    if "prefix_sha1" not in columns:  # manifest written before prefix hashes; those offsets are trusted once
+        cur.execute("ALTER TABLE ingest_manifest ADD COLUMN prefix_sha1 TEXT NOT NULL DEFAULT ''")
+
+
+def create_rollup_schema(cur) -> None:
+    # Daily prices per canonical commodity, averaged across markets, at three levels:
+    # all India (state = '', district = ''), per state (district = '') and per (state, district).
+    # modal_price/min_price/max_price are the mean of the markets' values; n_records = rows averaged.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS daily_commodity_prices (
+            commodity TEXT NOT NULL,
+            state TEXT NOT NULL,
+            district TEXT NOT NULL,
+            date TEXT NOT NULL,
+            modal_price REAL,
+            min_price REAL,
+            max_price REAL,
+            n_records INTEGER NOT NULL,
+            PRIMARY KEY (commodity, state, district, date)
+        ) WITHOUT ROWID
+    """)
+
+
+ROLLUP_LEVELS = [
+    ("''", "''", ""),
+    ("p.state", "''", "AND p.state <> ''"),
+    ("p.state", "p.district", "AND p.state <> '' AND p.district <> ''"),
+]
+
+
+def build_rollup(cur, touched: bool = False) -> None:
+    """Rebuild daily_commodity_prices from crop_prices.
+    touched=True: only the (commodity, date) pairs in temp table touched_keys (incremental mode)."""
+    create_rollup_schema(cur)
+    if touched:
+        cur.execute(
+            "DELETE FROM daily_commodity_prices WHERE (commodity, date) IN (SELECT commodity, date FROM touched_keys)"
+        )
+        source = (
+            "touched_keys k JOIN commodities c ON c.canonical = k.commodity"
+            " JOIN crop_prices p ON p.commodity_id = c.id AND p.date = k.date"
+        )
+    else:
+        cur.execute("DELETE FROM daily_commodity_prices")
+        source = "crop_prices p JOIN commodities c ON c.id = p.commodity_id"
+    for state_col, district_col, extra in ROLLUP_LEVELS:
+        cur.execute(f"""
+            INSERT INTO daily_commodity_prices
+                (commodity, state, district, date, modal_price, min_price, max_price, n_records)
+            SELECT c.canonical, {state_col}, {district_col}, p.date,
+                   AVG(p.modal_price), AVG(p.min_price), AVG(p.max_price), COUNT(*)
+            FROM {source}
+            WHERE p.modal_price IS NOT NULL AND p.modal_price > 0 {extra}
+            GROUP BY c.canonical, {state_col}, {district_col}, p.date
+        """)
+
+
+def commodity_ids(cur) -> dict:
+    """name -> id for every commodity already in the lookup table (canonical names refreshed from the alias map)."""
+    ids = {}
+    for cid, name, canonical in cur.execute("SELECT id, name, canonical FROM commodities").fetchall():
+        ids[name] = cid
+        if canonical != canonical_commodity(name):
+            cur.execute("UPDATE commodities SET canonical = ? WHERE id = ?", (canonical_commodity(name), cid))
+    return ids
+
+
+def commodity_id(cur, ids: dict, name: str) -> int:
+    cid = ids.get(name)
+    if cid is None:
+        cur.execute("INSERT INTO commodities (name, canonical) VALUES (?, ?)", (name, canonical_commodity(name)))
+        cid = ids[name] = cur.lastrowid
+    return cid
+
+
+def create_indexes(cur) -> None:
+    for sql in INDEXES:
+        cur.execute(sql)
+    cur.execute("ANALYZE")
+
+
+def _byte_ranges(path: Path, target: int):
+    """Split the CSV body into ~target-byte ranges ending on record boundaries: a newline with an even number
+    of '"' before it, i.e. not inside a quoted field (which may contain newlines). Returns (header bytes, ranges)."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        header = f.readline()
+        ranges = []
+        start = base = len(header)  # base: file offset of the current block
+        quotes = 0  # '"' bytes in the body before the current block
+        cut = start + target  # split at the first record boundary at or after this offset
+        while True:
+            block = f.read(READ_BLOCK)
+            if not block:
+                break
+            while cut < base + len(block):
+                nl = block.find(b"\n", max(cut - base, 0))
+                if nl < 0:
+                    break  # keep looking in the next block
+                cut = base + nl + 1
+                if (quotes + block.count(b'"', 0, nl)) % 2 == 0:
+                    ranges.append((start, cut))
+                    start, cut = cut, cut + target
+            quotes += block.count(b'"')
+            base += len(block)
+    if start < size:
+        ranges.append((start, size))
+    return header, ranges
+
+
+def _parse_range(job):
+    """Worker: parse one byte range of crop_prices.csv into insert tuples (commodity id resolved by the writer)."""
+    path, start, end, pos = job
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    rows = []
+    for row in csv.reader(io.StringIO(text)):
+        if not row:
+            continue
+        n = len(row)
+        date, commodity, state, district, modal, low, high = (
+            row[i].strip() if i is not None and i < n else "" for i in pos
+        )
+        rows.append((to_iso_date(date), commodity, state, district,
+                     _parse_float(modal), _parse_float(low), _parse_float(high)))
+    return rows
+
+
+def _insert_parallel(conn, cur, ids: dict, csv_path: Path, insert_sql: str, workers: int) -> int:
+    """Parse byte ranges in a process pool; this process is the single writer. At most 2 ranges per worker in flight."""
+    header, ranges = _byte_ranges(csv_path, FAST_RANGE_BYTES)
+    col = {name: i for i, name in enumerate(next(csv.reader([header.decode("utf-8")]), []))}
+    pos = tuple(col.get(c) for c in ("date", "commodity", "state", "district", "modal_price", "min_price", "max_price"))
+    jobs = iter((str(csv_path), start, end, pos) for start, end in ranges)
+    total = 0
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        pending = deque(pool.apply_async(_parse_range, (job,)) for job in islice(jobs, workers * 2))
+        while pending:
+            rows = pending.popleft().get()
+            job = next(jobs, None)
+            if job is not None:
+                pending.append(pool.apply_async(_parse_range, (job,)))
+            cur.executemany(insert_sql, [
+                (d, c, commodity_id(cur, ids, c), st, di, mo, lo, hi) for d, c, st, di, mo, lo, hi in rows
+            ])
+            total += len(rows)
+            print(f"  Loaded {total} rows ({total / (time.perf_counter() - t0):,.0f} rows/s) ...")
+    conn.commit()
+    return total
+
+
+def bump_data_version(cur) -> int:
+    """Increment PRAGMA user_version after the rollup changes. The API keys cached forecasts and graphs on it,
+    so they are recomputed after every ingest."""
+    version = cur.execute("PRAGMA user_version").fetchone()[0] + 1
+    cur.execute(f"PRAGMA user_version = {version}")
+    return version
+
+
+def full_load(conn, csv_path: Path = CSV_PATH, workers: int = 0) -> int:
+    """Reload crop_prices from the merged CSV. workers=0: stream in one process.
+    workers>=1: fast bulk load (parallel parsing, journal and fsync off until indexes and rollup are built)."""
+    cur = conn.cursor()
+    # Full reload: recreate the table (older DBs have no commodity_id) and index after inserting.
+    # Rows from the merged CSV carry no natural key, so incremental state starts over too.
+    cur.execute("DROP TABLE IF EXISTS crop_prices")
+    create_schema(cur)
+    cur.execute("DELETE FROM ingest_manifest")
+    ids = commodity_ids(cur)
     conn.commit()
+    if workers:
+        # Nobody else should write during a bulk load; a crash here means re-running the load anyway
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA cache_size=-262144")
 
+    insert_sql = (
+        "INSERT INTO crop_prices (date, commodity, commodity_id, state, district, modal_price, min_price, max_price)"
+        " VALUES (?,?,?,?,?,?,?,?)"
+    )
+    t0 = time.perf_counter()
     total = 0
-    with open(CSV_PATH, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        chunk = []
-        for row in r:
-            chunk.append((
-                row.get("date", "").strip(),
-                row.get("commodity", "").strip(),
-                row.get("state", "").strip(),
-                row.get("district", "").strip(),
-                _to_float(row.get("modal_price", "")),
-                _to_float(row.get("min_price", "")),
-                _to_float(row.get("max_price", "")),
-            ))
-            if len(chunk) >= CHUNK_SIZE:
-                cur.executemany(
-                    "INSERT INTO crop_prices (date, commodity, state, district, modal_price, min_price, max_price) VALUES (?,?,?,?,?,?,?)",
-                    chunk,
-                )
+    if workers:
+        total = _insert_parallel(conn, cur, ids, csv_path, insert_sql, workers)
+    else:
+        with open(csv_path, "r", encoding="utf-8") as f:
+            r = csv.DictReader(f)
+            chunk = []
+            for row in r:
+                commodity = row.get("commodity", "").strip()
+                chunk.append((
+                    to_iso_date(row.get("date", "")),
+                    commodity,
+                    commodity_id(cur, ids, commodity),
+                    row.get("state", "").strip(),
+                    row.get("district", "").strip(),
+                    _parse_float(row.get("modal_price", "")),
+                    _parse_float(row.get("min_price", "")),
+                    _parse_float(row.get("max_price", "")),
+                ))
+                if len(chunk) >= CHUNK_SIZE:
+                    cur.executemany(insert_sql, chunk)
+                    conn.commit()
+                    total += len(chunk)
+                    print(f"  Loaded {total} rows ({total / (time.perf_counter() - t0):,.0f} rows/s) ...")
+                    chunk = []
+
+            if chunk:
+                cur.executemany(insert_sql, chunk)
                 conn.commit()
                 total += len(chunk)
-                print(f"  Loaded {total} rows ...")
-                chunk = []
+    elapsed = time.perf_counter() - t0
+    print(f"  Inserted {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    print("  Building indexes ...")
+    create_indexes(cur)
+    conn.commit()
+    print("  Building daily_commodity_prices rollup ...")
+    build_rollup(cur)
+    bump_data_version(cur)
+    conn.commit()
+    if workers:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return total
+
+
+def _source_files():
+    files = []
+    for f in sorted(ARCHIVE_CSV_DIR.glob("*.csv")) if ARCHIVE_CSV_DIR.exists() else []:
+        try:
+            if int(f.stem) >= MIN_YEAR:
+                files.append(f)
+        except ValueError:
+            pass
+    return files
 
-        if chunk:
-            cur.executemany(
-                "INSERT INTO crop_prices (date, commodity, state, district, modal_price, min_price, max_price) VALUES (?,?,?,?,?,?,?)",
-                chunk,
+
+def _resume_offset(path: Path, offset: int, prefix_sha1: str):
+    """sha1 of the bytes before `offset` if they are still what was loaded (the file was only appended to),
+    else None: the file shrank or was rewritten in place (e.g. re-downloaded) and must be re-read from the start."""
+    digest = hashlib.sha1()
+    if offset == 0:
+        return digest
+    if path.stat().st_size < offset:
+        return None
+    with open(path, "rb") as f:
+        remaining = offset
+        last = b""
+        while remaining:
+            block = f.read(min(READ_BLOCK, remaining))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+            last = block[-1:]
+    if last != b"\n" or (prefix_sha1 and digest.hexdigest() != prefix_sha1):
+        return None
+    return digest
+
+
+def _read_new_blocks(path: Path, offset: int, digest):
+    """Yield (header, text, end_offset) for complete lines after byte `offset`, READ_BLOCK bytes at a time.
+    A trailing partial line (file still being written) is left for the next run.
+    digest (sha1 of the bytes before offset) is updated with every yielded byte."""
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8", errors="ignore")]), [])
+        if offset < len(header_line):
+            digest.update(header_line)
+        offset = max(offset, len(header_line))
+        f.seek(offset)
+        rest = b""
+        while True:
+            block = f.read(READ_BLOCK)
+            if not block:
+                return
+            data = rest + block
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                rest = data
+                continue
+            offset += cut
+            rest = data[cut:]
+            digest.update(data[:cut])
+            yield header, data[:cut].decode("utf-8", errors="ignore"), offset
+
+
+def incremental_load(conn) -> None:
+    files = _source_files()
+    if not files:
+        print(f"No year CSVs >= {MIN_YEAR} in {ARCHIVE_CSV_DIR}")
+        return
+    cur = conn.cursor()
+    create_schema(cur)
+    for sql in INDEXES:
+        cur.execute(sql)
+    # First incremental run: rows from a full load have no natural key, start from the archive files. The delete,
+    # the reload and the rollup are one transaction, so readers keep the old table until it is all done and an
+    # interrupted run leaves it (and the empty manifest) as it was.
+    rebuild = cur.execute("SELECT COUNT(*) FROM ingest_manifest").fetchone()[0] == 0
+    if rebuild:
+        cur.execute("DELETE FROM crop_prices")
+    ids = commodity_ids(cur)
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS touched (commodity_id INTEGER, date TEXT, PRIMARY KEY (commodity_id, date))")
+    if not rebuild:
+        conn.commit()
+
+    manifest = {
+        row[0]: row[1:]
+        for row in cur.execute("SELECT source, size, mtime_ns, byte_offset, rows, prefix_sha1 FROM ingest_manifest").fetchall()
+    }
+    upsert_sql = (
+        "INSERT INTO crop_prices (date, commodity, commodity_id, state, district, market, variety, grade,"
+        " modal_price, min_price, max_price) VALUES (?,?,?,?,?,?,?,?,?,?,?)"
+        f" ON CONFLICT {NATURAL_KEY} DO UPDATE SET"
+        " modal_price = excluded.modal_price, min_price = excluded.min_price, max_price = excluded.max_price"
+    )
+    total = 0
+    for path in files:
+        st = path.stat()
+        size, mtime_ns, offset, file_rows, prefix_sha1 = manifest.get(path.name, (0, 0, 0, 0, ""))
+        if (st.st_size, st.st_mtime_ns) == (size, mtime_ns) and offset:
+            continue  # untouched since the last run
+        digest = _resume_offset(path, offset, prefix_sha1)
+        if digest is None:
+            print(f"  {path.name}: changed before the loaded offset, re-reading from the start")
+            offset, file_rows, digest = 0, 0, hashlib.sha1()
+        new_rows = 0
+        for header, text, end_offset in _read_new_blocks(path, offset, digest):
+            col = {name: i for i, name in enumerate(header)}
+            pos = {our: col.get(arch) for arch, our in {**ARCHIVE_MAP, **KEY_COLUMNS}.items()}
+
+            def field(row, name):
+                i = pos[name]
+                return row[i].strip() if i is not None and i < len(row) else ""
+
+            chunk, touched = [], set()
+            for row in csv.reader(io.StringIO(text)):
+                if not row:
+                    continue
+                commodity = field(row, "commodity")
+                cid = commodity_id(cur, ids, commodity)
+                date = to_iso_date(field(row, "date"))
+                chunk.append((
+                    date, commodity, cid, field(row, "state"), field(row, "district"),
+                    field(row, "market") or NO_MARKET, field(row, "variety"), field(row, "grade"),
+                    _parse_float(field(row, "modal_price")), _parse_float(field(row, "min_price")),
+                    _parse_float(field(row, "max_price")),
+                ))
+                touched.add((cid, date))
+            cur.executemany(upsert_sql, chunk)
+            cur.executemany("INSERT OR IGNORE INTO touched (commodity_id, date) VALUES (?, ?)", touched)
+            new_rows += len(chunk)
+            # Offset moves in the same transaction as the rows, so an interrupted run resumes cleanly
+            cur.execute(
+                "INSERT OR REPLACE INTO ingest_manifest"
+                " (source, size, mtime_ns, byte_offset, rows, loaded_at, prefix_sha1) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path.name, st.st_size, st.st_mtime_ns, end_offset, file_rows + new_rows,
+                 datetime.now().isoformat(timespec="seconds"), digest.hexdigest()),
             )
-            conn.commit()
-            total += len(chunk)
+            if not rebuild:
+                conn.commit()
+        if new_rows == 0 and offset:
+            # Appended-to nothing (e.g. only touched): remember size/mtime so the next run skips the file
+            cur.execute("UPDATE ingest_manifest SET size = ?, mtime_ns = ?, prefix_sha1 = ? WHERE source = ?",
+                        (st.st_size, st.st_mtime_ns, digest.hexdigest(), path.name))
+            if not rebuild:
+                conn.commit()
+        total += new_rows
+        print(f"  {path.name}: {new_rows} new rows")
+
+    n_touched = cur.execute("SELECT COUNT(*) FROM touched").fetchone()[0]
+    if rebuild:
+        print("  Rebuilding rollup ...")
+        build_rollup(cur)
+        cur.execute("ANALYZE")
+        bump_data_version(cur)
+        conn.commit()
+    elif n_touched:
+        print(f"  Refreshing rollup for {n_touched} (commodity, date) pairs ...")
+        cur.execute("DROP TABLE IF EXISTS touched_keys")
+        cur.execute("""
+            CREATE TEMP TABLE touched_keys AS
+            SELECT DISTINCT c.canonical AS commodity, t.date FROM touched t JOIN commodities c ON c.id = t.commodity_id
+        """)
+        build_rollup(cur, touched=True)
+        cur.execute("ANALYZE")
+        bump_data_version(cur)
+        conn.commit()
+    print(f"  Upserted {total} rows.")
+
 
-    cur.execute("SELECT COUNT(*) FROM crop_prices")
-    n = cur.fetchone()[0]
+def main():
+    parser = argparse.ArgumentParser(description="Load crop prices into crop_prices.db.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Append only new rows from the archive year CSVs (tracked in ingest_manifest)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Full reload with parallel CSV parsing and journal/fsync off during the load")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Parser processes for --fast (default: CPU count - 1)")
+    args = parser.parse_args()
+    if not args.incremental and not CSV_PATH.exists():
+        print("No crop_prices.csv found. Run download_from_kaggle.py then merge_all_crops.py first.")
+        return
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(DB_PATH)
+    # WAL persists in the DB file: the API's read-only connections keep reading while we load
+    conn.execute("PRAGMA journal_mode=WAL")
+    if args.incremental:
+        print("load_data_into_db.py started (incremental).")
+        incremental_load(conn)
+    elif args.fast:
+        print(f"load_data_into_db.py started (fast bulk load, {args.workers} parser processes).")
+        full_load(conn, CSV_PATH, workers=max(1, args.workers))
+    else:
+        print("load_data_into_db.py started (chunked – low memory).")
+        full_load(conn)
+    n = conn.execute("SELECT COUNT(*) FROM crop_prices").fetchone()[0]
     conn.close()
-    print(f"Done. Total rows in DB: {n}")
+    print(f"Done in {time.perf_counter() - t0:.1f}s. Total rows in DB: {n}")
 
 if __name__ == "__main__":
     main()
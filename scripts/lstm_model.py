@@ -1,15 +1,127 @@
-"""LSTM model definition. Used by train_lstm.py and the prediction API."""
+"""LSTM model definition. Used by train_lstm.py and the prediction API.
+LSTMModel can also be exported as a TorchScript serving artifact (<Commodity>_jit.pt): scripted with its
+stateful step(), frozen (weights folded in as constants) and optimized for inference; or as a dynamically
+int8-quantized one (<Commodity>_int8.pt) for CPU serving.
+Recent torch deprecates torch.jit (script/freeze/save/load, in favour of torch.export / torch.compile) and
+torch.ao.quantization ("will be removed in 2.10"; still present in 2.14). Both still work; the helpers below
+silence exactly those deprecation messages, nothing else. Moving the artifacts to torch.export is the way out
+once quantize_dynamic is gone."""
+import contextlib
+import copy
+import warnings
+from pathlib import Path
+from typing import Optional, Tuple
+
+import torch
 import torch.nn as nn
 
+JIT_PARITY_ATOL = 1e-5  # max |eager - TorchScript| (scaled units) for an exported artifact to be kept
+
+# (category, message prefix) of the known deprecation warnings raised by the export helpers
+_TORCH_DEPRECATIONS = (
+    (FutureWarning, r"`torch\.jit\.\w+` is deprecated"),
+    (DeprecationWarning, r"torch\.ao\.quantization is deprecated"),
+    (UserWarning, r"torch\.quantize_per_tensor, torch\.quantize_per_channel and other quantized tensor creation"),
+)
+
+
+@contextlib.contextmanager
+def _quiet_deprecations():
+    """Ignore only the torch.jit / torch.ao.quantization deprecation warnings listed above."""
+    with warnings.catch_warnings():
+        for category, message in _TORCH_DEPRECATIONS:
+            warnings.filterwarnings("ignore", message=message, category=category)
+        yield
+
 
 class LSTMModel(nn.Module):
-    def __init__(self, input_size=1, hidden_size=64, num_layers=2, dropout=0.2):
+    """horizon=1: next-day model (forecast recursively). horizon=H: direct model, predicts the next H days in one pass."""
+
+    def __init__(self, input_size=1, hidden_size=64, num_layers=2, dropout=0.2, horizon=1):
         super().__init__()
+        self.horizon = horizon
         self.lstm = nn.LSTM(
             input_size, hidden_size, num_layers=num_layers, batch_first=True, dropout=dropout
         )
-        self.fc = nn.Linear(hidden_size, 1)
+        self.fc = nn.Linear(hidden_size, horizon)
 
     def forward(self, x):
-        out, _ = self.lstm(x)
-        return self.fc(out[:, -1, :]).squeeze(-1)
+        return self.step(x, None)[0]
+
+    @torch.jit.export
+    def step(self, x, state: Optional[Tuple[torch.Tensor, torch.Tensor]] = None):
+        """Stateful API: run x (batch, T, 1) on from `state` ((h, c), None = zeros).
+        Returns (prediction after the last step, new state). Warm up once on the lookback
+        window, then feed one value (batch, 1, 1) per call for O(1) work per forecast day.
+        Not equivalent to re-encoding the window each day (what training sees): trained models drift
+        apart over long horizons, so the API only uses it opt-in (LSTM_CARRY_STATE_DAYS)."""
+        out, state = self.lstm(x, state)
+        return self.fc(out[:, -1, :]).squeeze(-1), state
+
+
+class GlobalLSTMModel(nn.Module):
+    """One model for all commodities: each step's input is the scaled price plus a learned embedding of
+    the commodity id, so any crop is served from the same weights and mixed-crop batches run in one pass."""
+
+    def __init__(self, n_commodities, embed_dim=8, hidden_size=64, num_layers=2, dropout=0.2, horizon=1):
+        super().__init__()
+        self.horizon = horizon
+        self.embedding = nn.Embedding(n_commodities, embed_dim)
+        self.lstm = nn.LSTM(
+            1 + embed_dim, hidden_size, num_layers=num_layers, batch_first=True, dropout=dropout
+        )
+        self.fc = nn.Linear(hidden_size, horizon)
+
+    def forward(self, x, ids):
+        return self.step(x, ids)[0]
+
+    def step(self, x, ids, state=None):
+        """Like LSTMModel.step; ids: (batch,) long tensor of commodity ids (one per row)."""
+        emb = self.embedding(ids).unsqueeze(1).expand(-1, x.shape[1], -1)
+        out, state = self.lstm(torch.cat([x, emb], dim=-1), state)
+        return self.fc(out[:, -1, :]).squeeze(-1), state
+
+
+def export_torchscript(model: LSTMModel):
+    """Scripted, frozen, inference-optimized copy of a CPU LSTMModel in eval mode; forward() and step() behave
+    as in the eager model."""
+    with _quiet_deprecations():
+        frozen = torch.jit.freeze(torch.jit.script(model.eval()), preserved_attrs=["step"])
+        try:
+            return torch.jit.optimize_for_inference(frozen, other_methods=["step"])
+        except (RuntimeError, TypeError):  # older torch: no other_methods, or a pass it cannot apply
+            return frozen
+
+
+def quantize_int8(model: LSTMModel):
+    """Dynamic int8 quantization of a CPU LSTMModel as a frozen TorchScript module: LSTM and Linear weights are
+    stored as int8, activations are quantized on the fly, so no calibration data is needed. Not bit-identical to
+    the fp32 model; compare accuracy (evaluate_models.py) before serving it."""
+    with _quiet_deprecations():
+        quantized = torch.ao.quantization.quantize_dynamic(copy.deepcopy(model).eval(), {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+        return torch.jit.freeze(torch.jit.script(quantized), preserved_attrs=["step"])
+
+
+def save_torchscript(module, path: Path) -> None:
+    with _quiet_deprecations():
+        torch.jit.save(module, str(path))
+
+
+def load_torchscript(path: Path):
+    with _quiet_deprecations():
+        return torch.jit.load(str(path), map_location="cpu")
+
+
+def parity_error(eager: LSTMModel, exported, lookback: int = 60, days: int = 30, batch: int = 8, seed: int = 0) -> float:
+    """Max |eager - exported| on random windows: forward(), and for next-day models a `days`-step step() rollout."""
+    x = torch.rand(batch, lookback, 1, generator=torch.Generator().manual_seed(seed))
+    with torch.no_grad():
+        err = (eager(x) - exported(x)).abs().max().item()
+        if eager.horizon == 1:
+            a, sa = eager.step(x)
+            b, sb = exported.step(x)
+            for _ in range(days):
+                err = max(err, (a - b).abs().max().item())
+                a, sa = eager.step(a.reshape(batch, 1, 1), state=sa)
+                b, sb = exported.step(b.reshape(batch, 1, 1), state=sb)
+    return err
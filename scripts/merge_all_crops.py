@@ -3,9 +3,23 @@ Merge crop CSV files into one crop_prices.csv.
 Streams row-by-row so it does NOT load everything into memory (avoids laptop hang).
 Uses archive/csv/ (2020–till date) if present, else data/**/*.csv.
 Run from project root: python scripts/merge_all_crops.py
+                       python scripts/merge_all_crops.py --parallel [--workers N]
+With --parallel each year CSV is transformed in its own process into a shard (same bytes as the streaming
+path), and the shards are concatenated in year order.
+
+Optionally also write a columnar copy (needs pyarrow) partitioned by year and canonical commodity,
+so one commodity's history is read from its own Parquet files only:
+    python scripts/merge_all_crops.py --parquet      → data/crop_prices_parquet/year=2024/commodity=Onion/...
 """
+import argparse
 import csv
+import os
+import shutil
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 def log(msg):
@@ -19,7 +33,10 @@ if not ARCHIVE_CSV_DIR.exists():
 if not ARCHIVE_CSV_DIR.exists():
     ARCHIVE_CSV_DIR = PROJECT_ROOT / "archive" / "csv"
 MIN_YEAR = 2020
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
 OUTPUT_FILE = DATA_DIR / "crop_prices.csv"
+PARQUET_DIR = DATA_DIR / "crop_prices_parquet"
+PARQUET_BATCH_ROWS = 200_000  # CSV rows converted per Arrow record batch
 OUT_COLUMNS = ["date", "commodity", "state", "district", "modal_price", "min_price", "max_price"]
 
 ARCHIVE_MAP = {
@@ -32,9 +49,160 @@ ARCHIVE_MAP = {
     "Max_Price": "max_price",
 }
 
+COPY_BUFFER = 16 << 20  # bytes per read when concatenating shards
+
+
+def _column_positions(header: list) -> list:
+    """Header index of each ARCHIVE_MAP column (in output order), -1 if missing. Like DictReader, the last
+    of duplicate header names wins."""
+    last = {name: i for i, name in enumerate(header)}
+    return [last.get(arch_col, -1) for arch_col in ARCHIVE_MAP]
+
+
+def _merge_year(job):
+    """Worker: transform one archive year CSV into a shard of output rows (no header).
+    Positional mapping gives the same values as the DictReader path: missing column -> "",
+    short row -> "None" (DictReader's restval), blank lines skipped. Returns (rows, bytes read, seconds)."""
+    path, shard = job
+    t0 = time.perf_counter()
+    rows = 0
+    with open(path, "r", encoding="utf-8", errors="ignore") as f, \
+            open(shard, "w", newline="", encoding="utf-8") as out:
+        r = csv.reader(f)
+        header = next(r, None)
+        if header is not None:
+            positions = _column_positions(header)
+            w = csv.writer(out)
+            for row in r:
+                if not row:
+                    continue
+                n = len(row)
+                w.writerow(["" if i < 0 else row[i].strip() if i < n else "None" for i in positions])
+                rows += 1
+    return rows, path.stat().st_size, time.perf_counter() - t0
+
+
+def merge_parallel(files: list, workers: int) -> int:
+    """Merge year files into OUTPUT_FILE with one worker process per file. Returns the row count."""
+    files = sorted(files, key=lambda p: p.stem)
+    shard_dir = Path(tempfile.mkdtemp(prefix=".merge_shards_", dir=DATA_DIR))
+    try:
+        shards = [shard_dir / f"{p.stem}.csv" for p in files]
+        total_rows = 0
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(files)))) as pool:
+            for path, (rows, size, elapsed) in zip(files, pool.map(_merge_year, zip(files, shards))):
+                total_rows += rows
+                log(f"  {path.name}: {rows} rows, {size / 1e6:.1f} MB in {elapsed:.1f}s "
+                    f"({rows / max(elapsed, 1e-9):,.0f} rows/s, {size / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+        with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as out_f:
+            csv.writer(out_f).writerow(OUT_COLUMNS)
+        with open(OUTPUT_FILE, "ab") as out_f:
+            for shard in shards:
+                with open(shard, "rb") as f:
+                    shutil.copyfileobj(f, out_f, COPY_BUFFER)
+        return total_rows
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+def _parquet_batches(csv_path: Path):
+    """Stream crop_prices.csv as Arrow record batches: ISO date32, year, canonical commodity, float prices,
+    dictionary-encoded strings. Rows with an unparseable date are dropped."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    from load_data_into_db import _parse_float, to_iso_date
+    from popular_commodities import canonical_commodity
+
+    strings = pa.dictionary(pa.int32(), pa.string())
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=32 << 20),
+        convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in OUT_COLUMNS}, include_columns=OUT_COLUMNS),
+    )
+    canonical = {}
+    for batch in reader:
+        if batch.num_rows == 0:
+            continue
+        cols = {name: batch.column(name).to_pylist() for name in OUT_COLUMNS}
+        dates = pc.strptime(pa.array([to_iso_date(d or "") for d in cols["date"]]), format="%Y-%m-%d", unit="s", error_is_null=True)
+        names = [(c or "").strip() for c in cols["commodity"]]
+        for n in set(names) - canonical.keys():
+            canonical[n] = canonical_commodity(n)
+        table = pa.table({
+            "date": dates.cast(pa.date32()),
+            "archive_commodity": pa.array(names).cast(strings),
+            "state": pa.array([(v or "").strip() for v in cols["state"]]).cast(strings),
+            "district": pa.array([(v or "").strip() for v in cols["district"]]).cast(strings),
+            "modal_price": pa.array([_parse_float(v) for v in cols["modal_price"]], pa.float64()),
+            "min_price": pa.array([_parse_float(v) for v in cols["min_price"]], pa.float64()),
+            "max_price": pa.array([_parse_float(v) for v in cols["max_price"]], pa.float64()),
+            "year": pc.year(dates).cast(pa.int16()),
+            "commodity": pa.array([canonical[n] for n in names]),
+        }).filter(pc.is_valid(dates))
+        yield from table.to_batches(max_chunksize=PARQUET_BATCH_ROWS)
+
+
+def write_parquet(csv_path: Path = OUTPUT_FILE, out_dir: Path = PARQUET_DIR) -> None:
+    """Write csv_path as a Parquet dataset partitioned by year and canonical commodity (hive layout).
+    A full rebuild: written to a sibling temp dir that then replaces out_dir, so no partition of an earlier
+    run (e.g. a commodity since renamed) survives and readers never see a half-written dataset."""
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        log("Install pyarrow for --parquet: pip install pyarrow")
+        sys.exit(1)
+    log(f"Writing Parquet dataset {out_dir} (partitioned by year, commodity) ...")
+    strings = pa.dictionary(pa.int32(), pa.string())
+    schema = pa.schema([
+        ("date", pa.date32()), ("archive_commodity", strings), ("state", strings), ("district", strings),
+        ("modal_price", pa.float64()), ("min_price", pa.float64()), ("max_price", pa.float64()),
+        ("year", pa.int16()), ("commodity", pa.string()),
+    ])
+    partitioning = ds.partitioning(pa.schema([("year", pa.int16()), ("commodity", pa.string())]), flavor="hive")
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}-", dir=out_dir.parent))
+    try:
+        ds.write_dataset(
+            _parquet_batches(csv_path),
+            tmp_dir,
+            schema=schema,
+            format="parquet",
+            partitioning=partitioning,
+            existing_data_behavior="overwrite_or_ignore",
+            max_partitions=100_000,
+            max_open_files=512,
+            file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+        )
+        # Written last: readers key their cached file list (and the API its cached responses) on its mtime
+        from columnar_store import VERSION_FILE
+        (tmp_dir / VERSION_FILE).write_text(datetime.now().isoformat(timespec="seconds") + "\n")
+        old_dir = None
+        if out_dir.exists():
+            old_dir = out_dir.with_name(f"{tmp_dir.name}-old")
+            out_dir.rename(old_dir)
+        tmp_dir.rename(out_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    log(f"Written: {out_dir}")
+
 
 def main():
-    log("merge_all_crops.py started (streaming mode – low memory).")
+    parser = argparse.ArgumentParser(description="Merge crop CSV files into data/crop_prices.csv.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Transform each archive year CSV in its own process, then concatenate in year order")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Worker processes for --parallel (default: CPU count - 1)")
+    parser.add_argument("--parquet", action="store_true",
+                        help=f"Also write a Parquet dataset partitioned by year and commodity ({PARQUET_DIR})")
+    args = parser.parse_args()
+    mode = f"parallel mode – {args.workers} workers" if args.parallel else "streaming mode – low memory"
+    log(f"merge_all_crops.py started ({mode}).")
     log(f"Project root: {PROJECT_ROOT}")
     log(f"Archive CSV dir: {ARCHIVE_CSV_DIR} (exists: {ARCHIVE_CSV_DIR.exists()})")
 
@@ -56,22 +224,28 @@ def main():
             return
         log(f"Streaming {len(files)} files: {[p.name for p in files]} ...")
 
-        with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as out_f:
-            w = csv.DictWriter(out_f, fieldnames=OUT_COLUMNS, extrasaction="ignore")
-            w.writeheader()
-            for path in sorted(files, key=lambda p: p.stem):
-                log(f"  Reading {path.name} ...")
-                file_rows = 0
-                with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                    r = csv.DictReader(f)
-                    for row in r:
-                        out = {}
-                        for arch_col, our_col in ARCHIVE_MAP.items():
-                            out[our_col] = str(row.get(arch_col, "")).strip()
-                        w.writerow(out)
-                        file_rows += 1
-                total_rows += file_rows
-                log(f"  Done. Rows from this file: {file_rows}, total so far: {total_rows}")
+        if args.parallel:
+            t0 = time.perf_counter()
+            total_rows = merge_parallel(files, args.workers)
+            elapsed = time.perf_counter() - t0
+            log(f"  Merged in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s overall)")
+        else:
+            with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as out_f:
+                w = csv.DictWriter(out_f, fieldnames=OUT_COLUMNS, extrasaction="ignore")
+                w.writeheader()
+                for path in sorted(files, key=lambda p: p.stem):
+                    log(f"  Reading {path.name} ...")
+                    file_rows = 0
+                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                        r = csv.DictReader(f)
+                        for row in r:
+                            out = {}
+                            for arch_col, our_col in ARCHIVE_MAP.items():
+                                out[our_col] = str(row.get(arch_col, "")).strip()
+                            w.writerow(out)
+                            file_rows += 1
+                    total_rows += file_rows
+                    log(f"  Done. Rows from this file: {file_rows}, total so far: {total_rows}")
     else:
         files = sorted(DATA_DIR.glob("**/*.csv"))
         files = [f for f in files if f.resolve() != OUTPUT_FILE.resolve()]
@@ -90,6 +264,8 @@ def main():
 
     log(f"Total rows: {total_rows}")
     log(f"Written: {OUTPUT_FILE}")
+    if args.parquet:
+        write_parquet()
     log("merge_all_crops.py finished.")
 
 if __name__ == "__main__":
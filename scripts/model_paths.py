@@ -0,0 +1,24 @@
+"""Where model files live. No torch import, so the API can index models without loading torch."""
+from pathlib import Path
+
+REGIONAL_DIR = "regional"  # per-state / per-district models, under the models dir
+
+
+def model_files(models_dir: Path, commodity: str, state: str = "", district: str = ""):
+    """(.pt, _scaler.json) paths of a model. National: <models_dir>/<Commodity>.pt. Regional models are sharded
+    by commodity and state so no directory grows large: regional/<Commodity>/<State>.pt and
+    regional/<Commodity>/<State>/<District>.pt."""
+    safe = commodity.replace(" ", "_")
+    if state:
+        base = Path(models_dir) / REGIONAL_DIR / safe.replace("/", "_")
+        for part in (state, district) if district else (state,):
+            base = base / part.strip().replace(" ", "_").replace("/", "_")
+    else:
+        base = Path(models_dir) / safe
+    return base.with_name(base.name + ".pt"), base.with_name(base.name + "_scaler.json")
+
+
+def variant_file(model_path: Path, variant: str) -> Path:
+    """Serving variant saved next to a model .pt: <Commodity>_<variant>.pt (e.g. "jit" = TorchScript artifact).
+    Has no _scaler.json of its own, so it is never mistaken for a trained commodity."""
+    return model_path.with_name(f"{model_path.stem}_{variant}.pt")
@@ -2,6 +2,7 @@
 Popular commodities: one LSTM model per commodity.
 Use this list when training (train one model per item) and for frontend dropdowns.
 Keep in sync with frontend/src/constants/commodities.ts
+COMMODITY_ALIASES maps a commodity to the archive/dataset names it appears under (DB/CSV "commodity" column).
 """
 POPULAR_COMMODITIES = [
     "Onion",
@@ -35,3 +36,27 @@ POPULAR_COMMODITIES = [
     "Cauliflower",
     "Brinjal",
 ]
+
+# Map our commodity name to archive/dataset names (must match DB/CSV "commodity" column)
+COMMODITY_ALIASES = {
+    "Rice": ["Rice", "Paddy (Dhan)(Common)", "Paddy (Dhan)"],
+    "Gram": ["Gram", "Bengal Gram (Gram)(Whole)"],
+    "Arhar": ["Arhar", "Arhar (Tur)(Whole)", "Tur (Arhar)"],
+    "Bajra": ["Bajra", "Bajra (Pearl Millet/Cumbu)"],
+    "Jowar": ["Jowar", "Jowar (Sorghum)"],
+    "Lentil": ["Lentil", "Lentil (Masur)(Whole)"],
+    "Moong": ["Moong", "Green Gram (Moong)(Whole)"],
+    "Urad": ["Urad", "Black Gram (Urd Beans)(Whole)"],
+    "Soybean": ["Soybean", "Soyabean"],
+    "Cardamom": ["Cardamom", "Cardamoms"],
+    "Black Pepper": ["Black Pepper", "Pepper garbled", "Pepper ungarbled"],
+    "Ginger": ["Ginger", "Ginger (Green)"],
+    "Coriander": ["Coriander", "Coriander (Leaves)", "Corriander seed"],
+}
+
+_CANONICAL = {alias: name for name, aliases in COMMODITY_ALIASES.items() for alias in aliases}
+
+
+def canonical_commodity(name: str) -> str:
+    """Resolve an archive commodity name to our commodity name (e.g. "Soyabean" -> "Soybean")."""
+    return _CANONICAL.get(name, name)
@@ -0,0 +1,119 @@
+"""
+Precompute forecasts for every trained commodity into the `forecasts` table of crop_prices.db.
+Run after train_lstm.py (and after each load_data_into_db.py):
+    python scripts/precompute_forecasts.py              # all trained commodities, 365 days
+    python scripts/precompute_forecasts.py --days 30 --commodities Onion Potato
+
+Each row holds the national forecast for the next --days days, made by the API's own model registry and
+rollout (batched per loaded model), tagged with the model file digest, the data version (PRAGMA user_version)
+and the latest price date it started from. The API serves any horizon up to --days from the row while all
+three still match, and forecasts live otherwise, so a stale table is never wrong, only unused.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = PROJECT_ROOT / "data" / "crop_prices.db"
+MAX_DAYS = 365
+BATCH_SIZE = 64  # windows per rollout
+
+sys.path.insert(0, str(PROJECT_ROOT))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    commodity TEXT PRIMARY KEY,
+    model_digest TEXT NOT NULL,
+    data_version INTEGER NOT NULL,
+    last_date TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    predictions TEXT NOT NULL,
+    created_at TEXT NOT NULL
+)
+"""
+
+
+def precompute(api, commodities: list, days: int, batch_size: int = BATCH_SIZE) -> tuple:
+    """Forecast `days` days for each commodity, batched per loaded model.
+    Returns (rows for the forecasts table, {commodity: reason skipped})."""
+    version = api.data_version()
+    last_by_commodity = api.load_last_prices_many(commodities, api.LOOKBACK)
+    created_at = datetime.now().isoformat(timespec="seconds")
+    rows, skipped = [], {}
+    groups = {}  # id(entry.model) -> [(commodity, entry, last, scaled)]
+    for commodity in commodities:
+        entry = api.registry.get(commodity)
+        last = last_by_commodity.get(commodity, [])
+        if entry is None:
+            skipped[commodity] = "no trained model"
+            continue
+        if len(last) < api.LOOKBACK:
+            skipped[commodity] = f"fewer than {api.LOOKBACK} days of prices"
+            continue
+        values = np.array([p[1] for p in last], dtype=np.float32)
+        span = entry.max_val - entry.min_val
+        scaled = (values - entry.min_val) / span if span > 0 else values * 0
+        groups.setdefault(id(entry.model), []).append((commodity, entry, last, scaled))
+    for group in groups.values():
+        for i in range(0, len(group), batch_size):
+            chunk = group[i : i + batch_size]
+            first = chunk[0][1]
+            ids = None if first.commodity_id is None else [e.commodity_id for _, e, _, _ in chunk]
+            outs = api._rollout(first, np.stack([s for _, _, _, s in chunk]), days, ids)
+            for (commodity, entry, last, _), row in zip(chunk, outs):
+                preds = api._format_predictions(commodity, entry, last, row)["predictions"]
+                rows.append((commodity, entry.digest, version, last[-1][0], days, json.dumps(preds, separators=(",", ":")), created_at))
+    return rows, skipped
+
+
+def write_forecasts(rows: list, db_path: Path = DB_PATH) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(SCHEMA)
+        conn.executemany(
+            "INSERT OR REPLACE INTO forecasts (commodity, model_digest, data_version, last_date, days, predictions, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute forecasts for all trained commodities into crop_prices.db.")
+    parser.add_argument("--days", type=int, default=MAX_DAYS, help=f"Forecast horizon stored per commodity (default {MAX_DAYS})")
+    parser.add_argument("--commodities", nargs="+", help="Only these commodities (default: every trained model)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"Windows per rollout (default {BATCH_SIZE})")
+    args = parser.parse_args()
+    if not 1 <= args.days <= MAX_DAYS:
+        parser.error(f"--days must be between 1 and {MAX_DAYS}")
+    if not DB_PATH.exists():
+        print(f"No database at {DB_PATH}. Run load_data_into_db.py first.", file=sys.stderr)
+        sys.exit(1)
+    try:
+        from backend.lstm_prediction import main as api
+    except ImportError as e:
+        print(f"Install the API dependencies (pip install torch fastapi): {e}", file=sys.stderr)
+        sys.exit(1)
+
+    commodities = args.commodities or api.get_trained_crops()
+    if not commodities:
+        print("No trained models. Run train_lstm.py first.")
+        return
+    t0 = time.perf_counter()
+    rows, skipped = precompute(api, commodities, args.days, max(1, args.batch_size))
+    write_forecasts(rows)
+    for commodity, reason in sorted(skipped.items()):
+        print(f"  Skipped {commodity}: {reason}")
+    print(f"Wrote {len(rows)} forecasts ({args.days} days each) to {DB_PATH} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
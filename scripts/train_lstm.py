@@ -1,11 +1,23 @@
 """
 Train one LSTM model per popular commodity.
-Uses 2020–till date from crop_prices.db (or data/crop_prices.csv).
+Uses 2020–till date from crop_prices.db (or data/crop_prices_parquet, or data/crop_prices.csv).
 Run from project root: python scripts/train_lstm.py
+                       python scripts/train_lstm.py --workers 4   (commodities trained in parallel processes)
+                       python scripts/train_lstm.py --global      (one model for all commodities, see train_global)
+                       python scripts/train_lstm.py --regional state [--workers 4]   (one model per commodity and state;
+                           `--regional district` per district), stored under data/models/regional/
 """
+import argparse
+import contextlib
+import copy
 import json
+import multiprocessing
+import os
 import sqlite3
 import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import numpy as np
@@ -15,57 +27,95 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "crop_prices.db"
 CSV_PATH = PROJECT_ROOT / "data" / "crop_prices.csv"
 MODELS_DIR = PROJECT_ROOT / "data" / "models"
+LOG_DIR = MODELS_DIR / "logs"  # per-commodity training logs with --workers
+GLOBAL_MODEL = MODELS_DIR / "_global.pt"  # --global: shared weights for all commodities
+GLOBAL_META = MODELS_DIR / "_global_meta.json"  # commodity -> embedding id + scaler, horizon, metrics
+GLOBAL_EMBED_DIM = 8
+# --regional: series need this many days; models start from the national weights and fine-tune for fewer epochs
+REGIONAL_MIN_DAYS = int(os.environ.get("TRAIN_REGIONAL_MIN_DAYS", "120"))
+REGIONAL_EPOCHS = int(os.environ.get("TRAIN_REGIONAL_EPOCHS", "15"))
+EXPORT_JIT = os.environ.get("TRAIN_EXPORT_JIT", "1") == "1"  # also write <Commodity>_jit.pt (TorchScript) for serving
+# Opt-in: also write <Commodity>_int8.pt (dynamic int8) and <Commodity>_int8.json (its accuracy vs fp32)
+EXPORT_INT8 = os.environ.get("TRAIN_EXPORT_INT8", "0") == "1"
+SUMMARY_MAX_ROWS = 50  # wall-time summary lists at most this many (slowest) models
+GLOBAL_BATCH_SIZE = 256  # the global model sees every commodity's windows per epoch
 START_YEAR = 2020
 END_YEAR = 2026  # till date (use data from archive 2020–2026)
 LOOKBACK = 60
-EPOCHS = int(__import__("os").environ.get("TRAIN_EPOCHS", "50"))  # e.g. TRAIN_EPOCHS=20 for quicker run
+EPOCHS = int(os.environ.get("TRAIN_EPOCHS", "50"))  # e.g. TRAIN_EPOCHS=20 for quicker run
 BATCH_SIZE = 32
+EVAL_BATCH_SIZE = 4096  # windows per forward pass when scoring validation windows
+# Days predicted per forward pass. 1 = next-day model (API forecasts recursively);
+# e.g. TRAIN_HORIZON=30 trains a direct multi-horizon model (whole month in one pass).
+HORIZON = int(os.environ.get("TRAIN_HORIZON", "1"))
 
 sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
-from popular_commodities import POPULAR_COMMODITIES
-
-
-# Map our commodity name to archive/dataset names (must match DB/CSV "commodity" column)
-COMMODITY_ALIASES = {
-    "Rice": ["Rice", "Paddy (Dhan)(Common)", "Paddy (Dhan)"],
-    "Gram": ["Gram", "Bengal Gram (Gram)(Whole)"],
-    "Arhar": ["Arhar", "Arhar (Tur)(Whole)", "Tur (Arhar)"],
-    "Bajra": ["Bajra", "Bajra (Pearl Millet/Cumbu)"],
-    "Jowar": ["Jowar", "Jowar (Sorghum)"],
-    "Lentil": ["Lentil", "Lentil (Masur)(Whole)"],
-    "Moong": ["Moong", "Green Gram (Moong)(Whole)"],
-    "Urad": ["Urad", "Black Gram (Urd Beans)(Whole)"],
-    "Soybean": ["Soybean", "Soyabean"],
-    "Cardamom": ["Cardamom", "Cardamoms"],
-    "Black Pepper": ["Black Pepper", "Pepper garbled", "Pepper ungarbled"],
-    "Ginger": ["Ginger", "Ginger (Green)"],
-    "Coriander": ["Coriander", "Coriander (Leaves)", "Corriander seed"],
-}
+from popular_commodities import COMMODITY_ALIASES, POPULAR_COMMODITIES, canonical_commodity
+import columnar_store
+from model_paths import model_files, variant_file
+from window_dataset import WindowDataset
 
 
 def _aliases(commodity: str):
     return list(dict.fromkeys([commodity] + COMMODITY_ALIASES.get(commodity, [])))
 
 
-def load_series(commodity: str) -> pd.Series:
-    """Load daily modal_price series for commodity (mean across markets), 2020–till date."""
+def _has_rollup(conn: sqlite3.Connection) -> bool:
+    """True if the DB has the daily_commodity_prices rollup. A DB built by an older load_data_into_db.py only
+    has crop_prices; it is aggregated per query instead (slower) until it is reloaded."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_commodity_prices'"
+    ).fetchone() is not None
+
+
+def _legacy_filter(commodity: str, state: str, district: str) -> tuple:
+    """WHERE clause and params selecting commodity's (aliases') priced crop_prices rows in START_YEAR..END_YEAR."""
+    aliases = list(dict.fromkeys(_aliases(commodity) + _aliases(canonical_commodity(commodity))))
+    where = f"commodity IN ({','.join('?' * len(aliases))}) AND modal_price > 0 AND date BETWEEN ? AND ?"
+    params = [*aliases, f"{START_YEAR}-01-01", f"{END_YEAR}-12-31"]
+    for column, value in (("state", state), ("district", district)):
+        if value:
+            where += f" AND {column} = ?"
+            params.append(value)
+    return where, params
+
+
+def load_series(commodity: str, state: str = "", district: str = "") -> pd.Series:
+    """Load daily modal_price series for commodity (mean across markets), 2020–till date.
+    All India by default; state (and district) select that region's series."""
     aliases = _aliases(commodity)
     if DB_PATH.exists():
         conn = sqlite3.connect(DB_PATH)
-        placeholders = ",".join("?" * len(aliases))
-        df = pd.read_sql_query(
-            f"""
-            SELECT date, AVG(modal_price) AS modal_price
-            FROM crop_prices
-            WHERE commodity IN ({placeholders}) AND modal_price IS NOT NULL AND modal_price > 0
-              AND CAST(SUBSTR(date, 1, 4) AS INT) BETWEEN ? AND ?
-            GROUP BY date
-            ORDER BY date
-            """,
-            conn,
-            params=(*aliases, START_YEAR, END_YEAR),
-        )
+        if _has_rollup(conn):
+            # Daily averages per level are precomputed in the rollup (load_data_into_db.py); ISO dates
+            # make the year range a primary-key range scan
+            df = pd.read_sql_query(
+                """
+                SELECT date, modal_price
+                FROM daily_commodity_prices
+                WHERE commodity = COALESCE((SELECT canonical FROM commodities WHERE name = ?), ?)
+                  AND state = ? AND district = ?
+                  AND date BETWEEN ? AND ?
+                ORDER BY date
+                """,
+                conn,
+                params=(commodity, commodity, state, district, f"{START_YEAR}-01-01", f"{END_YEAR}-12-31"),
+            )
+        else:
+            where, params = _legacy_filter(commodity, state, district)
+            df = pd.read_sql_query(
+                f"SELECT date, AVG(modal_price) AS modal_price FROM crop_prices WHERE {where} GROUP BY date ORDER BY date",
+                conn,
+                params=params,
+            )
         conn.close()
+    elif columnar_store.available():
+        # Parquet copy (merge_all_crops.py --parquet): reads only this commodity's year partitions
+        rows = columnar_store.daily_prices(
+            canonical_commodity(commodity), start=f"{START_YEAR}-01-01", end=f"{END_YEAR}-12-31",
+            state=state or None, district=district or None,
+        )
+        df = pd.DataFrame([(d, m) for d, m, _, _ in rows], columns=["date", "modal_price"])
     elif CSV_PATH.exists():
         df = pd.read_csv(CSV_PATH)
         df = df[
@@ -73,6 +123,10 @@ def load_series(commodity: str) -> pd.Series:
             & (df["modal_price"].notna())
             & (df["modal_price"] > 0)
         ]
+        if state:
+            df = df[df["state"].astype(str).str.strip() == state]
+        if district:
+            df = df[df["district"].astype(str).str.strip() == district]
         if "date" not in df.columns:
             return pd.Series(dtype=float)
         df = df.groupby("date", as_index=False)["modal_price"].mean()
@@ -89,16 +143,73 @@ def load_series(commodity: str) -> pd.Series:
     return df.set_index("date")["modal_price"].astype(float)
 
 
-def build_sequences(series: np.ndarray, lookback: int):
-    """X: (n, lookback, 1), y: (n,)"""
-    X, y = [], []
-    for i in range(lookback, len(series)):
-        X.append(series[i - lookback : i].reshape(-1, 1))
-        y.append(series[i])
-    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+def predict_windows(model, ds: WindowDataset, idx: np.ndarray, device, with_ids: bool = False) -> np.ndarray:
+    """Model outputs for windows idx of ds, run EVAL_BATCH_SIZE windows at a time.
+    with_ids: pass each window's series index as the commodity id (GlobalLSTMModel)."""
+    import torch
+
+    outs = []
+    with torch.no_grad():
+        for batch in ds.batches(idx, EVAL_BATCH_SIZE, ids=with_ids):
+            inputs = (batch[0], batch[2]) if with_ids else (batch[0],)
+            outs.append(model(*(torch.from_numpy(a).to(device) for a in inputs)).cpu().numpy())
+    shape = (0,) if ds.horizon == 1 else (0, ds.horizon)
+    return np.concatenate(outs) if outs else np.empty(shape, np.float32)
+
+
+def forecast_metrics(pred_scaled: np.ndarray, y_scaled: np.ndarray, min_val: float, max_val: float) -> dict:
+    """RMSE, MAE and MAPE (%) in price units of scaled predictions vs targets (next-day column for direct models)."""
+    pred = pred_scaled * (max_val - min_val) + min_val
+    true = y_scaled * (max_val - min_val) + min_val
+    return {
+        "RMSE": float(np.sqrt(np.mean((true - pred) ** 2))),
+        "MAE": float(np.mean(np.abs(true - pred))),
+        "MAPE": float(np.mean(np.abs((true - pred) / (np.abs(true) + 1e-8))) * 100),
+    }
+
+
+def list_regions(commodity: str, level: str = "state", min_days: int = REGIONAL_MIN_DAYS) -> list:
+    """(state, district) rollup series of commodity with at least min_days days in START_YEAR..END_YEAR.
+    level="state": per-state series (district ""), "district": per-district series. Needs crop_prices.db."""
+    if not DB_PATH.exists():
+        return []
+    conn = sqlite3.connect(DB_PATH)
+    if not _has_rollup(conn):
+        where, params = _legacy_filter(commodity, "", "")
+        group = "state, ''" if level == "state" else "state, district"
+        rows = conn.execute(
+            f"""
+            SELECT {group}
+            FROM crop_prices
+            WHERE {where} AND COALESCE(state, '') <> ''{" AND COALESCE(district, '') <> ''" if level != "state" else ""}
+            GROUP BY {group}
+            HAVING COUNT(DISTINCT date) >= ?
+            ORDER BY {group}
+            """,
+            (*params, min_days),
+        ).fetchall()
+        conn.close()
+        return rows
+    rows = conn.execute(
+        f"""
+        SELECT state, district
+        FROM daily_commodity_prices
+        WHERE commodity = COALESCE((SELECT canonical FROM commodities WHERE name = ?), ?)
+          AND state <> '' AND district {"=" if level == "state" else "<>"} ''
+          AND date BETWEEN ? AND ?
+        GROUP BY state, district
+        HAVING COUNT(*) >= ?
+        ORDER BY state, district
+        """,
+        (commodity, commodity, f"{START_YEAR}-01-01", f"{END_YEAR}-12-31", min_days),
+    ).fetchall()
+    conn.close()
+    return rows
 
 
-def train_one(commodity: str):
+def train_one(commodity: str, state: str = "", district: str = ""):
+    """Train and save commodity's model. With state (and district), train that region's model instead,
+    warm-started from the national model when one with the same horizon exists."""
     try:
         import torch
         import torch.nn as nn
@@ -106,90 +217,303 @@ def train_one(commodity: str):
         print("Install PyTorch: pip install torch", file=sys.stderr)
         sys.exit(1)
 
-    series = load_series(commodity)
-    if len(series) < LOOKBACK + 100:
-        print(f"  {commodity}: skip (only {len(series)} days)")
+    label = "/".join(p for p in (commodity, state, district) if p)
+    series = load_series(commodity, state, district)
+    min_days = LOOKBACK + HORIZON + (100 if not state else 20)
+    if len(series) < max(min_days, REGIONAL_MIN_DAYS if state else 0):
+        print(f"  {label}: skip (only {len(series)} days)")
         return
 
     values = series.values
     min_val, max_val = values.min(), values.max()
     if max_val <= min_val:
-        print(f"  {commodity}: skip (constant)")
+        print(f"  {label}: skip (constant)")
         return
     scaled = (values - min_val) / (max_val - min_val)
-    X, y = build_sequences(scaled, LOOKBACK)
-    n = len(X)
-    train_n = int(0.85 * n)
-    X_train, y_train = X[:train_n], y[:train_n]
-    X_val, y_val = X[train_n:], y[train_n:]
+    ds = WindowDataset([scaled], LOOKBACK, HORIZON)
+    train_idx, val_idx = ds.split(0.85)
+    y_val = ds.batch(val_idx)[1]
 
     from lstm_model import LSTMModel
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = LSTMModel().to(device)
+    model = LSTMModel(horizon=HORIZON).to(device)
+    epochs = EPOCHS
+    if state:
+        national_pt, national_scaler = model_files(MODELS_DIR, commodity)
+        if national_pt.exists() and national_scaler.exists():
+            with open(national_scaler) as f:
+                if int(json.load(f).get("horizon", 1)) == HORIZON:
+                    model.load_state_dict(torch.load(national_pt, map_location=device))
+                    epochs = min(EPOCHS, REGIONAL_EPOCHS)  # fine-tuning never runs longer than TRAIN_EPOCHS
     criterion = nn.MSELoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
 
-    Xt = torch.from_numpy(X_train).to(device)
-    yt = torch.from_numpy(y_train).to(device)
-    Xv = torch.from_numpy(X_val).to(device)
-    yv = torch.from_numpy(y_val).to(device)
-
-    for epoch in range(EPOCHS):
+    for epoch in range(epochs):
         model.train()
-        perm = np.random.permutation(len(X_train))
-        for i in range(0, len(perm), BATCH_SIZE):
-            idx = perm[i : i + BATCH_SIZE]
+        perm = train_idx[np.random.permutation(len(train_idx))]
+        for X, y in ds.batches(perm, BATCH_SIZE):
             optimizer.zero_grad()
-            pred = model(Xt[idx])
-            loss = criterion(pred, yt[idx])
+            pred = model(torch.from_numpy(X).to(device))
+            loss = criterion(pred, torch.from_numpy(y).to(device))
             loss.backward()
             optimizer.step()
         if (epoch + 1) % 10 == 0:
             model.eval()
-            with torch.no_grad():
-                val_pred = model(Xv)
-                val_loss = criterion(val_pred, yv).item()
-            print(f"  {commodity} epoch {epoch+1} val_loss={val_loss:.6f}")
+            val_loss = float(np.mean((predict_windows(model, ds, val_idx, device) - y_val) ** 2))
+            print(f"  {label} epoch {epoch+1} val_loss={val_loss:.6f}")
 
-    # Compute RMSE, MAE, MAPE on validation set (in original scale)
+    # Compute RMSE, MAE, MAPE on validation set (in original scale; next-day column for direct models)
     model.eval()
-    with torch.no_grad():
-        val_pred_scaled = model(Xv).cpu().numpy()
-    val_pred_orig = val_pred_scaled * (max_val - min_val) + min_val
-    val_orig = y_val * (max_val - min_val) + min_val  # y_val is numpy (scaled)
+    val_pred_scaled = predict_windows(model, ds, val_idx, device)
+    if HORIZON > 1:
+        val_pred_scaled, y_val = val_pred_scaled[:, 0], y_val[:, 0]
+    metrics = forecast_metrics(val_pred_scaled, y_val, min_val, max_val)
+    rmse, mae, mape = metrics["RMSE"], metrics["MAE"], metrics["MAPE"]
 
-    rmse = np.sqrt(np.mean((val_orig - val_pred_orig) ** 2))
-    mae = np.mean(np.abs(val_orig - val_pred_orig))
-    mape = np.mean(np.abs((val_orig - val_pred_orig) / (np.abs(val_orig) + 1e-8))) * 100
-
-    safe = commodity.replace(" ", "_")
-    MODELS_DIR.mkdir(parents=True, exist_ok=True)
-    torch.save(model.state_dict(), MODELS_DIR / f"{safe}.pt")
-    scaler = {"min": float(min_val), "max": float(max_val)}
-    with open(MODELS_DIR / f"{safe}_scaler.json", "w") as f:
+    model_path, scaler_path = model_files(MODELS_DIR, commodity, state, district)
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    torch.save(model.state_dict(), model_path)
+    scaler = {"min": float(min_val), "max": float(max_val), "horizon": HORIZON}
+    with open(scaler_path, "w") as f:
         json.dump(scaler, f)
-    metrics = {"RMSE": float(rmse), "MAE": float(mae), "MAPE": float(mape)}
-    with open(MODELS_DIR / f"{safe}_metrics.json", "w") as f:
+    with open(scaler_path.with_name(scaler_path.name.replace("_scaler.json", "_metrics.json")), "w") as f:
         json.dump(metrics, f, indent=2)
-    print(f"  {commodity}: saved {MODELS_DIR / safe}.pt  |  RMSE={rmse:.2f}  MAE={mae:.2f}  MAPE={mape:.2f}%")
+    print(f"  {label}: saved {model_path}  |  RMSE={rmse:.2f}  MAE={mae:.2f}  MAPE={mape:.2f}%")
+    if EXPORT_JIT:
+        err = export_jit(model, model_path)
+        if err is not None:
+            print(f"  {label}: saved {variant_file(model_path, 'jit').name} (max diff vs eager {err:.1e})")
+    else:
+        variant_file(model_path, "jit").unlink(missing_ok=True)  # an artifact of the previous weights
+    if EXPORT_INT8:
+        delta = export_int8(model, model_path, ds, val_idx, min_val, max_val, metrics)["delta"]
+        print(f"  {label}: saved {variant_file(model_path, 'int8').name}  |  vs fp32: RMSE {delta['RMSE']:+.2f}  "
+              f"MAE {delta['MAE']:+.2f}  MAPE {delta['MAPE']:+.3f} pts")
+    return metrics
+
+
+def export_jit(model, model_path: Path):
+    """Write the TorchScript serving artifact next to model_path if it matches the eager model within
+    JIT_PARITY_ATOL. Returns the parity error, or None if no artifact was written (a stale one is removed)."""
+    from lstm_model import JIT_PARITY_ATOL, export_torchscript, parity_error, save_torchscript
+
+    jit_path = variant_file(model_path, "jit")
+    eager = copy.deepcopy(model).cpu().eval()
+    try:
+        exported = export_torchscript(eager)
+        err = parity_error(eager, exported, LOOKBACK)
+    except Exception as e:
+        print(f"  TorchScript export failed for {model_path.name}: {e}")
+        jit_path.unlink(missing_ok=True)
+        return None
+    if err > JIT_PARITY_ATOL:
+        print(f"  {jit_path.name}: not written, differs from the eager model by {err:.2e}")
+        jit_path.unlink(missing_ok=True)
+        return None
+    save_torchscript(exported, jit_path)
+    return err
+
+
+def write_int8_report(model_path: Path, fp32: dict, int8: dict) -> dict:
+    """Write <Commodity>_int8.json: validation metrics of both models and int8 - fp32 deltas. The API only
+    serves the int8 model if its MAPE delta is within LSTM_INT8_MAX_MAPE_DELTA."""
+    report = {"fp32": fp32, "int8": int8, "delta": {k: int8[k] - fp32[k] for k in ("RMSE", "MAE", "MAPE")}}
+    with open(variant_file(model_path, "int8").with_suffix(".json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def export_int8(model, model_path: Path, ds: WindowDataset, val_idx: np.ndarray, min_val: float, max_val: float,
+                fp32_metrics: dict) -> dict:
+    """Write the dynamic-int8 variant of model next to model_path, scored on the same validation windows.
+    Returns its report (see write_int8_report)."""
+    import torch
+    from lstm_model import quantize_int8, save_torchscript
+
+    quantized = quantize_int8(copy.deepcopy(model).cpu().eval())
+    pred = predict_windows(quantized, ds, val_idx, torch.device("cpu"))
+    y = ds.batch(val_idx)[1]
+    if ds.horizon > 1:
+        pred, y = pred[:, 0], y[:, 0]
+    save_torchscript(quantized, variant_file(model_path, "int8"))
+    return write_int8_report(model_path, fp32_metrics, forecast_metrics(pred, y, min_val, max_val))
+
+
+def _init_worker(threads: int):
+    """Pool initializer: cap torch intra-op threads so workers x threads <= cores."""
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def _train_logged(job):
+    """Worker: train_one with stdout/stderr in LOG_DIR/<commodity>.log (regional jobs: sharded like the models).
+    job is a commodity or a (commodity, state, district) tuple. Never raises, so one failing model does not
+    stop the pool. Returns (label, status, seconds, log path)."""
+    commodity, state, district = (job, "", "") if isinstance(job, str) else job
+    label = "/".join(p for p in (commodity, state, district) if p)
+    log_path = model_files(LOG_DIR, commodity, state, district)[0].with_suffix(".log")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            status = "ok" if train_one(commodity, state, district) is not None else "skipped"
+        except BaseException:  # includes SystemExit from a missing dependency
+            traceback.print_exc()
+            status = "failed"
+    return label, status, time.perf_counter() - t0, log_path
+
+
+def train_parallel(commodities: list, workers: int) -> list:
+    """Train commodities (or (commodity, state, district) jobs) in a process pool;
+    returns [(label, status, seconds)] in completion order."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"  {workers} workers x {threads} torch threads, logs in {LOG_DIR}")
+    results = []
+    # spawn: workers start without the parent's torch/OpenMP thread state (and it works the same on Windows)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = {pool.submit(_train_logged, c): c for c in commodities}
+        for fut in as_completed(futures):
+            try:
+                commodity, status, seconds, log_path = fut.result()
+            except Exception as e:  # worker process died (e.g. out of memory)
+                job = futures[fut]
+                commodity = job if isinstance(job, str) else "/".join(p for p in job if p)
+                status, seconds, log_path = f"failed ({type(e).__name__})", 0.0, None
+            print(f"  {commodity}: {status} in {seconds:.1f}s" + (f"  [{log_path}]" if log_path else ""), flush=True)
+            results.append((commodity, status, seconds))
+    return results
+
+
+def train_global(commodities: list):
+    """Train one GlobalLSTMModel on all commodities' windows (each series min-max scaled on its own),
+    with the commodity id fed through a learned embedding. Writes _global.pt and _global_meta.json;
+    the API uses it for commodities without their own model."""
+    import torch
+    import torch.nn as nn
+    from lstm_model import GlobalLSTMModel
+
+    names, scalers, scaled_series = [], {}, []
+    for commodity in commodities:
+        series = load_series(commodity)
+        if len(series) < LOOKBACK + HORIZON + 100:
+            print(f"  {commodity}: skip (only {len(series)} days)")
+            continue
+        values = series.values
+        min_val, max_val = values.min(), values.max()
+        if max_val <= min_val:
+            print(f"  {commodity}: skip (constant)")
+            continue
+        # series index in the dataset = commodity id = embedding row
+        scalers[commodity] = {"id": len(names), "min": float(min_val), "max": float(max_val)}
+        names.append(commodity)
+        scaled_series.append((values - min_val) / (max_val - min_val))
+    if not names:
+        print("No commodity has enough data for the global model.")
+        return None
+
+    ds = WindowDataset(scaled_series, LOOKBACK, HORIZON)
+    train_idx, val_idx = ds.split(0.85)  # same chronological split per commodity as train_one
+    print(f"  global model: {len(names)} commodities, {len(train_idx)} training windows")
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = GlobalLSTMModel(len(names), embed_dim=GLOBAL_EMBED_DIM, horizon=HORIZON).to(device)
+    criterion = nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+
+    for epoch in range(EPOCHS):
+        model.train()
+        perm = train_idx[np.random.permutation(len(train_idx))]
+        for X, y, ids in ds.batches(perm, GLOBAL_BATCH_SIZE, ids=True):
+            optimizer.zero_grad()
+            pred = model(torch.from_numpy(X).to(device), torch.from_numpy(ids).to(device))
+            loss = criterion(pred, torch.from_numpy(y).to(device))
+            loss.backward()
+            optimizer.step()
+        if (epoch + 1) % 10 == 0:
+            print(f"  global epoch {epoch+1} train_loss={loss.item():.6f}")
+
+    # Per-commodity validation metrics in original scale (next-day column for direct models)
+    model.eval()
+    metrics = {}
+    for cid, commodity in enumerate(names):
+        idx = val_idx[ds.series_ids[val_idx] == cid]
+        if len(idx) == 0:
+            continue
+        pred, y_val = predict_windows(model, ds, idx, device, with_ids=True), ds.batch(idx)[1]
+        if HORIZON > 1:
+            pred, y_val = pred[:, 0], y_val[:, 0]
+        m = metrics[commodity] = forecast_metrics(pred, y_val, scalers[commodity]["min"], scalers[commodity]["max"])
+        print(f"  {commodity}: RMSE={m['RMSE']:.2f}  MAE={m['MAE']:.2f}  MAPE={m['MAPE']:.2f}%")
+
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    torch.save(model.state_dict(), GLOBAL_MODEL)
+    meta = {"embed_dim": GLOBAL_EMBED_DIM, "horizon": HORIZON, "commodities": scalers, "metrics": metrics}
+    with open(GLOBAL_META, "w") as f:
+        json.dump(meta, f, indent=2)
+    print(f"  global: saved {GLOBAL_MODEL} ({len(names)} commodities)")
+    return metrics
 
 
 def main():
-    if not DB_PATH.exists() and not CSV_PATH.exists():
-        print("No crop_prices.db or data/crop_prices.csv. Run data pipeline first.")
+    parser = argparse.ArgumentParser(description="Train one LSTM model per popular commodity.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Train commodities in N parallel processes (default 1: sequential, output to console)")
+    parser.add_argument("--global", dest="global_model", action="store_true",
+                        help=f"Train one shared model with a commodity embedding ({GLOBAL_MODEL.name}) instead")
+    parser.add_argument("--regional", choices=["state", "district"],
+                        help="Train one model per (commodity, state) or (commodity, state, district) series instead")
+    args = parser.parse_args()
+    if not DB_PATH.exists() and not columnar_store.available() and not CSV_PATH.exists():
+        print("No crop_prices.db, data/crop_prices_parquet or data/crop_prices.csv. Run data pipeline first.")
         sys.exit(1)
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     # Train only a subset? e.g. TRAIN_ONLY="Bajra;Jowar;Lentil;Moong;Urad;Arhar;Soybean;Cardamom;Black Pepper;Ginger;Coriander"
-    only = __import__("os").environ.get("TRAIN_ONLY", "").strip()
+    only = os.environ.get("TRAIN_ONLY", "").strip()
     if only:
         commodities = [c.strip() for c in only.split(";") if c.strip()]
     else:
         commodities = POPULAR_COMMODITIES
-    print(f"Training LSTM per commodity (lookback={LOOKBACK}, {START_YEAR}-{END_YEAR}) [{len(commodities)} commodities]")
-    for c in commodities:
-        train_one(c)
-    print("Done.")
+    kind = "global model" if args.global_model else f"per {args.regional}" if args.regional else "per commodity"
+    print(f"Training LSTM {kind} (lookback={LOOKBACK}, horizon={HORIZON}, {START_YEAR}-{END_YEAR}) [{len(commodities)} commodities]")
+    t0 = time.perf_counter()
+    if args.global_model:
+        train_global(commodities)
+        print(f"Done in {time.perf_counter() - t0:.1f}s.")
+        return
+    jobs = list(commodities)
+    if args.regional:
+        if not DB_PATH.exists():
+            print("--regional needs crop_prices.db (run scripts/load_data_into_db.py).")
+            sys.exit(1)
+        jobs = [(c, state, district) for c in commodities for state, district in list_regions(c, args.regional)]
+        print(f"  {len(jobs)} regional series with >= {REGIONAL_MIN_DAYS} days")
+    if args.workers > 1:
+        results = train_parallel(jobs, args.workers)
+    else:
+        results = []
+        for job in jobs:
+            t = time.perf_counter()
+            args_ = (job,) if isinstance(job, str) else job
+            status = "ok" if train_one(*args_) is not None else "skipped"
+            results.append(("/".join(p for p in args_ if p), status, time.perf_counter() - t))
+    wall = time.perf_counter() - t0
+
+    slowest = sorted(results, key=lambda r: -r[2])
+    print("\nWall time per " + ("model" if args.regional else "commodity")
+          + (f" ({SUMMARY_MAX_ROWS} slowest of {len(results)}):" if len(results) > SUMMARY_MAX_ROWS else ":"))
+    for c, status, seconds in slowest[:SUMMARY_MAX_ROWS]:
+        print(f"  {c:24s} {seconds:8.1f}s  {status}")
+    failed = [c for c, status, _ in results if status.startswith("failed")]
+    print(f"Done in {wall:.1f}s (sum of per-model times {sum(r[2] for r in results):.1f}s)."
+          + (f" Failed: {', '.join(failed)}" if failed else ""))
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+"""
+Sliding (lookback -> horizon) windows over scaled price series without materializing them.
+The series are stored once, end to end, in a float32 buffer; a window is just a start offset into a
+strided view of that buffer, so memory is ~1x the series instead of ~lookback x. Minibatches are
+gathered on demand. Used by train_lstm.py and evaluate_models.py.
+"""
+from typing import List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class WindowDataset:
+    """Window i is (X = series[j - lookback : j], y = series[j] or series[j : j + horizon]) for one of the
+    series; windows never cross from one series into the next. Indices run series by series, in time order."""
+
+    def __init__(self, series: List[np.ndarray], lookback: int, horizon: int = 1):
+        self.lookback = lookback
+        self.horizon = horizon
+        width = lookback + horizon
+        lengths = [len(s) for s in series]
+        self.buffer = np.concatenate([np.asarray(s, dtype=np.float32) for s in series]) if series else np.empty(0, np.float32)
+        # (len(buffer) - width + 1, width) view sharing the buffer's memory
+        self._view = sliding_window_view(self.buffer, width) if len(self.buffer) >= width else np.empty((0, width), np.float32)
+        starts, ids, self.counts = [], [], []
+        offset = 0
+        for sid, n in enumerate(lengths):
+            count = max(0, n - width + 1)
+            starts.append(np.arange(offset, offset + count, dtype=np.int64))
+            ids.append(np.full(count, sid, dtype=np.int64))
+            self.counts.append(count)
+            offset += n
+        self.starts = np.concatenate(starts) if starts else np.empty(0, np.int64)
+        self.series_ids = np.concatenate(ids) if ids else np.empty(0, np.int64)  # series index of each window
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def batch(self, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """X: (b, lookback, 1), y: (b,) for horizon=1 else (b, horizon). Only these b windows are copied."""
+        w = self._view[self.starts[idx]]
+        X = w[:, : self.lookback, None]
+        y = w[:, self.lookback] if self.horizon == 1 else w[:, self.lookback :]
+        return X, y
+
+    def split(self, train_frac: float = 0.85) -> Tuple[np.ndarray, np.ndarray]:
+        """Chronological split per series: the first int(train_frac * n) windows of each series train,
+        the rest validate. Returns (train indices, validation indices)."""
+        train, val = [], []
+        first = 0
+        for count in self.counts:
+            cut = first + int(train_frac * count)
+            train.append(np.arange(first, cut))
+            val.append(np.arange(cut, first + count))
+            first += count
+        if not train:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        return np.concatenate(train).astype(np.int64), np.concatenate(val).astype(np.int64)
+
+    def batches(self, idx: np.ndarray, batch_size: int, ids: bool = False):
+        """Yield (X, y) (plus the windows' series ids with ids=True) for idx in chunks of batch_size."""
+        for i in range(0, len(idx), batch_size):
+            chunk = idx[i : i + batch_size]
+            X, y = self.batch(chunk)
+            yield (X, y, self.series_ids[chunk]) if ids else (X, y)
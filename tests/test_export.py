@@ -0,0 +1,64 @@
+"""TorchScript and int8 serving artifacts of seeded, untrained models."""
+import os
+
+import pytest
+import torch
+
+import evaluate_models
+from lstm_model import (
+    JIT_PARITY_ATOL, LSTMModel, export_torchscript, load_torchscript, parity_error, quantize_int8, save_torchscript,
+)
+from model_paths import model_files, variant_file
+
+INT8_ATOL = 0.05  # int8 weights are not bit-identical, only close on [0, 1]-scaled inputs
+
+
+def _model(seed, horizon=1):
+    torch.manual_seed(seed)
+    return LSTMModel(horizon=horizon).eval()
+
+
+@pytest.mark.parametrize("horizon", [1, 7])
+def test_export_torchscript_parity(horizon, tmp_path):
+    eager = _model(0, horizon)
+    exported = export_torchscript(eager)
+    assert parity_error(eager, exported) <= JIT_PARITY_ATOL
+    save_torchscript(exported, tmp_path / "m_jit.pt")
+    assert parity_error(eager, load_torchscript(tmp_path / "m_jit.pt")) <= JIT_PARITY_ATOL
+
+
+def test_exported_step_carries_state():
+    eager = _model(1)
+    exported = export_torchscript(eager)
+    x = torch.rand(2, 60, 1, generator=torch.Generator().manual_seed(1))
+    with torch.no_grad():
+        a, sa = eager.step(x)
+        b, sb = exported.step(x)
+        a, _ = eager.step(a.reshape(2, 1, 1), state=sa)
+        b, _ = exported.step(b.reshape(2, 1, 1), state=sb)
+    torch.testing.assert_close(a, b, atol=JIT_PARITY_ATOL, rtol=0)
+
+
+@pytest.mark.parametrize("horizon", [1, 7])
+def test_quantize_int8(horizon, tmp_path):
+    eager = _model(2, horizon)
+    quantized = quantize_int8(eager)
+    assert parity_error(eager, quantized) <= INT8_ATOL
+    save_torchscript(quantized, tmp_path / "m_int8.pt")
+    loaded = load_torchscript(tmp_path / "m_int8.pt")
+    x = torch.rand(4, 60, 1, generator=torch.Generator().manual_seed(2))
+    with torch.no_grad():
+        torch.testing.assert_close(loaded(x), quantized(x), atol=0, rtol=0)
+    assert parity_error(eager, loaded) <= INT8_ATOL
+
+
+def test_check_jit_skips_stale_artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(evaluate_models, "MODELS_DIR", tmp_path)
+    model_path, scaler_path = model_files(tmp_path, "Onion")
+    eager = _model(3)
+    save_torchscript(export_torchscript(eager), variant_file(model_path, "jit"))
+    torch.save(eager.state_dict(), model_path)
+    scaler_path.write_text('{"min": 0.0, "max": 1.0, "horizon": 1}')
+    jit = variant_file(model_path, "jit")
+    os.utime(jit, ns=(model_path.stat().st_mtime_ns - 10**9,) * 2)
+    assert evaluate_models.check_jit("Onion") == {"stale": True}
@@ -0,0 +1,85 @@
+"""Forecast rollouts on seeded, untrained models over the full 1-365 day range the API accepts."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+from backend.lstm_prediction import main
+from lstm_model import GlobalLSTMModel, LSTMModel
+
+LOOKBACK = main.LOOKBACK
+MAX_DAYS = 365
+
+
+def _model(seed, **kwargs):
+    torch.manual_seed(seed)
+    return LSTMModel(**kwargs).eval()
+
+
+def _windows(seed, batch=4):
+    return np.random.default_rng(seed).random((batch, LOOKBACK), dtype=np.float32)
+
+
+def window_rollout(model, windows, days, horizon=1, extra=()):
+    """Reference: re-encode the latest LOOKBACK days for every forward pass, as in training."""
+    seq = [torch.from_numpy(windows)]
+    with torch.no_grad():
+        while sum(s.shape[1] for s in seq) < LOOKBACK + days:
+            x = torch.cat(seq, dim=1)[:, -LOOKBACK:].unsqueeze(-1)
+            seq.append(model(x, *extra).reshape(len(windows), horizon))
+    return torch.cat(seq, dim=1)[:, LOOKBACK : LOOKBACK + days].numpy()
+
+
+def step_rollout(model, windows, days, extra=()):
+    """Warm up once on the window, then carry the (h, c) state forward one day at a time."""
+    outs = []
+    with torch.no_grad():
+        out, state = model.step(torch.from_numpy(windows).unsqueeze(-1), *extra)
+        outs.append(out)
+        for _ in range(days - 1):
+            out, state = model.step(out.reshape(len(windows), 1, 1), *extra, state=state)
+            outs.append(out)
+    return torch.stack(outs, dim=1).reshape(len(windows), days).numpy()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_step_rollout_matches_window_rollout(seed):
+    model, windows = _model(seed), _windows(seed)
+    windowed = window_rollout(model, windows, MAX_DAYS)
+    stepped = step_rollout(model, windows, MAX_DAYS)
+    for days in (1, 7, 30, 90, 180, MAX_DAYS):
+        np.testing.assert_allclose(stepped[:, :days], windowed[:, :days], rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("days", [1, 30, MAX_DAYS])
+def test_api_rollout_reencodes_window_by_default(days, monkeypatch):
+    monkeypatch.setattr(main, "CARRY_STATE_DAYS", 0)
+    model, windows = _model(0), _windows(0)
+    out = main._rollout(SimpleNamespace(model=model, horizon=1), windows, days)
+    assert out.shape == (len(windows), days)
+    np.testing.assert_allclose(out, window_rollout(model, windows, days), rtol=1e-6, atol=1e-7)
+
+
+@pytest.mark.parametrize("horizon,days", [(7, 1), (7, 30), (30, MAX_DAYS)])
+def test_api_rollout_direct_models(horizon, days):
+    model, windows = _model(1, horizon=horizon), _windows(1)
+    out = main._rollout(SimpleNamespace(model=model, horizon=horizon), windows, days)
+    np.testing.assert_allclose(out, window_rollout(model, windows, days, horizon), rtol=1e-6, atol=1e-7)
+
+
+def test_api_rollout_carried_state_opt_in(monkeypatch):
+    monkeypatch.setattr(main, "CARRY_STATE_DAYS", MAX_DAYS)
+    model, windows = _model(2), _windows(2)
+    out = main._rollout(SimpleNamespace(model=model, horizon=1), windows, MAX_DAYS)
+    np.testing.assert_allclose(out, step_rollout(model, windows, MAX_DAYS), rtol=1e-6, atol=1e-7)
+
+
+def test_api_rollout_global_model():
+    torch.manual_seed(3)
+    model, windows = GlobalLSTMModel(n_commodities=5).eval(), _windows(3)
+    ids = [0, 4, 2, 2]
+    extra = (torch.as_tensor(ids, dtype=torch.long),)
+    out = main._rollout(SimpleNamespace(model=model, horizon=1), windows, 60, ids)
+    np.testing.assert_allclose(out, window_rollout(model, windows, 60, extra=extra), rtol=1e-6, atol=1e-7)
+    np.testing.assert_allclose(step_rollout(model, windows, 60, extra), out, rtol=1e-5, atol=1e-6)